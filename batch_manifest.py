@@ -0,0 +1,179 @@
+"""batch_manifest.py
+
+   Records finished export jobs to skip them in a later run with the same settings
+
+   @file batch_manifest.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+
+# Read once at import, setting the umask to read it is not thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+@contextmanager
+def atomic_output(path: str):
+    """Provides a temporary file path which replaces the output file only if writing was successful.
+       A crash during writing never leaves a half-written output file. The temporary file has a
+       unique name in the directory of the output file, so several writers of the same output
+       never share it.
+
+    Args:
+        path (str): Path to the output file
+
+    Yields:
+        str: Temporary path with the same file extension to write to
+    """
+    root, ext = os.path.splitext(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(suffix=".partial" + ext, prefix=os.path.basename(root) + ".", dir=os.path.dirname(root))
+    os.close(handle)
+    try:
+        yield temp_path
+        # mkstemp creates the file readable for the owner only, use the mode of a normally created file
+        mode = os.stat(path).st_mode & 0o7777 if os.path.exists(path) else 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def file_checksum(path: str) -> str:
+    """Calculates the SHA-256 checksum of a file
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex digest of the file content
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def input_fingerprint(measurement: str) -> dict:
+    """Describes a measurement file by path, size and modification time
+
+    Args:
+        measurement (str): Path to measurement
+
+    Returns:
+        dict: Fingerprint of the measurement, only the path if the file does not exist
+    """
+    if not os.path.exists(measurement):
+        return {"path": os.path.abspath(measurement)}
+    stat = os.stat(measurement)
+    return {"path": os.path.abspath(measurement), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def job_key(measurement: str, settings: dict) -> str:
+    """Generates a unique key for an export job from its input and settings
+
+    Args:
+        measurement (str): Path to measurement
+        settings (dict): Export settings of the job, must be json serializable
+
+    Returns:
+        str: Key of the job
+    """
+    content = json.dumps({"input": input_fingerprint(measurement), "settings": settings}, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class BatchManifest:
+    """Stores the state of every export job in a json file. The file is updated after each job.
+    """
+
+    def __init__(self, path: str):
+        """Initialize function of the class BatchManifest. Loads an existing manifest
+
+        Args:
+            path (str): Path to the manifest file
+        """
+        self.path = path
+        self.jobs = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding="utf-8") as file:
+                    self.jobs = json.load(file)
+            except ValueError:
+                self.jobs = {}
+
+    def is_done(self, key: str, outputs: list) -> bool:
+        """Checks if a job is finished and its output files are unchanged
+
+        Args:
+            key (str): Key of the job
+            outputs (list): Paths to the output files of the job
+
+        Returns:
+            bool: True if the job can be skipped
+        """
+        job = self.jobs.get(key)
+        if job is None or job["status"] != "done":
+            return False
+        if sorted(job["outputs"]) != sorted(os.path.abspath(path) for path in outputs):
+            return False
+        for path, checksum in job["outputs"].items():
+            if not os.path.exists(path) or file_checksum(path) != checksum:
+                return False
+        return True
+
+    def mark_done(self, key: str, measurement: str, settings: dict, outputs: list):
+        """Records a finished job with the checksums of its output files
+
+        Args:
+            key (str): Key of the job
+            measurement (str): Path to measurement
+            settings (dict): Export settings of the job
+            outputs (list): Paths to the output files of the job
+        """
+        self.jobs[key] = {
+            "status": "done",
+            "input": input_fingerprint(measurement),
+            "settings": settings,
+            "outputs": {os.path.abspath(path): file_checksum(path) for path in outputs},
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self.save()
+
+    def mark_failed(self, key: str, measurement: str, settings: dict, error: str):
+        """Records a failed job, it is repeated in the next run
+
+        Args:
+            key (str): Key of the job
+            measurement (str): Path to measurement
+            settings (dict): Export settings of the job
+            error (str): Error message
+        """
+        self.jobs[key] = {
+            "status": "failed",
+            "input": input_fingerprint(measurement),
+            "settings": settings,
+            "outputs": {},
+            "error": error,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self.save()
+
+    def save(self):
+        """Writes the manifest atomically to the json file
+        """
+        with atomic_output(self.path) as temp_path:
+            with open(temp_path, 'w', encoding="utf-8") as file:
+                json.dump(self.jobs, file, indent=4)
@@ -0,0 +1,105 @@
+"""benchmark_decoding.py
+
+   Measures how the decoding of a single measurement scales with the number of workers
+
+   Usage: python benchmark_decoding.py measurement.mf4 [--labels A B ...] [--workers 1 2 4 8]
+                                       [--executor thread|process] [--repeat 3]
+
+   @file benchmark_decoding.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import time
+import argparse
+import asammdf
+
+import mdf_export
+import mdf_cache
+
+
+def header_parse_time(meas: str, repeat: int) -> float:
+    """Measures the time to open the measurement and parse its header without the MDF cache
+
+    Args:
+        meas (str): Path to measurement
+        repeat (int): Number of runs, the fastest run is used
+
+    Returns:
+        float: Fastest time in seconds
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asammdf.MDF(meas).close()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(meas: str, labels: list, workers: list, executor: str, repeat: int) -> list:
+    """Decodes the labels of the measurement with every number of workers and measures the time.
+       The first call of every number of workers starts with an empty MDF cache, so it includes
+       the header parse of the main handle and of every additional handle of the workers, as in
+       the first export of a measurement. The following calls reuse the cached handles and only
+       measure the decoding. With the process executor the worker processes keep their own cache,
+       which is not emptied between the numbers of workers.
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels which should be decoded
+        workers (list): Numbers of workers to measure
+        executor (str): "thread" or "process"
+        repeat (int): Number of warm runs per number of workers, the fastest run is used
+
+    Returns:
+        list: Number of workers, time of the cold run and fastest warm time in seconds and number of decoded samples
+    """
+    results = []
+    for count in workers:
+        mdf_cache.close_all()
+        start = time.perf_counter()
+        signals = mdf_export.read_native_signals(meas, labels, count, executor)
+        cold = time.perf_counter() - start
+        del signals
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            signals = mdf_export.read_native_signals(meas, labels, count, executor)
+            times.append(time.perf_counter() - start)
+        samples = sum(len(values) for _, values in signals.values())
+        del signals
+        results.append((count, cold, min(times), samples))
+    return results
+
+
+def main():
+    """Runs the benchmark and prints the header parse time and the cold and warm time and speedup for every number of workers
+    """
+    parser = argparse.ArgumentParser(description="Benchmark of the parallel decoding of one measurement")
+    parser.add_argument("measurement", help="path to the measurement")
+    parser.add_argument("--labels", nargs="*", help="labels to decode, default are all labels of the measurement")
+    parser.add_argument("--workers", nargs="*", type=int, default=sorted(set([1, 2, 4, mdf_export.DECODE_WORKERS])), help="numbers of workers to measure")
+    parser.add_argument("--executor", choices=["thread", "process"], default=mdf_export.DECODE_EXECUTOR, help="pool for the decoding")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per number of workers")
+    args = parser.parse_args()
+
+    labels = args.labels or mdf_export.extract_signal_labels(args.measurement)
+    try:
+        parse_time = header_parse_time(args.measurement, args.repeat)
+        results = benchmark(args.measurement, labels, args.workers, args.executor, args.repeat)
+    finally:
+        mdf_cache.close_all()
+        mdf_export.shutdown_executors()
+
+    print(f"{os.path.basename(args.measurement)}: {len(labels)} labels, executor {args.executor}, pool size {mdf_export.DECODE_WORKERS}")
+    print(f"Header parse of one handle: {parse_time:.3f} s")
+    print(f"{'workers':>8} {'cold [s]':>10} {'speedup':>8} {'warm [s]':>10} {'speedup':>8} {'MSamples/s':>11}")
+    for count, cold, warm, samples in results:
+        print(f"{count:>8} {cold:>10.3f} {results[0][1] / cold:>8.2f} {warm:>10.3f} {results[0][2] / warm:>8.2f} {samples / warm / 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""conversion_service.py
+
+   Provides the conversion of measurements as a local HTTP service
+
+   Usage: python conversion_service.py [--port 8765] [--workers 2] [--queue-size 16]
+
+   POST /jobs                      Submit a job, returns the job id
+                                   {"measurements": [...], "profile": "P3" or "labels": [...],
+                                    "raster": 0.1, "method": "interpolate", "formats": ["excel", "matlab"],
+                                    "raw": false, raw values with conversion table,
+                                    "output_path": optional, default is the path of the measurement}
+   GET  /jobs                      Status of all jobs
+   GET  /jobs/<id>                 Status and progress of a job
+   GET  /jobs/<id>/outputs/<n>     Download the n-th output file of a job
+   GET  /profiles                  All profiles of the profiles.json file
+
+   The output files are named <measurement>_export_<job id>, so jobs never overwrite each other
+
+   @file conversion_service.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import sys
+import json
+import uuid
+import queue
+import shutil
+import argparse
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import mdf_export
+import mdf_cache
+import raw_conversion
+
+
+PROFILES_PATH = "profiles.json"     # Path to the json file with the export profiles of the tool
+HOST = "127.0.0.1"      # Only local connections are accepted
+PORT = 8765             # Default port of the service
+WORKERS = 2             # Default number of jobs which are converted in parallel
+QUEUE_SIZE = 16         # Default number of jobs which can wait for a worker
+JOB_HISTORY = 1000      # Maximum number of finished jobs which are kept for status requests
+RETRY_AFTER = 5         # Seconds after which a rejected job can be submitted again
+
+
+def load_profiles() -> dict:
+    """Loads the profiles of the profiles.json file without starting the GUI
+
+    Returns:
+        dict: All profiles, keyed by their name
+    """
+    with open(PROFILES_PATH, 'r') as file:
+        return json.load(file)
+
+
+class ConversionJob:
+    """Conversion of one or more measurements submitted to the service
+    """
+
+    def __init__(self, request: dict):
+        """Initialize function of the class ConversionJob. Validates the request
+
+        Args:
+            request (dict): Json body of the submit request
+
+        Raises:
+            ValueError: If the request is invalid
+        """
+        measurements = request.get("measurements")
+        if isinstance(measurements, str):
+            measurements = [measurements]
+        if not isinstance(measurements, list) or not measurements or not all(isinstance(meas, str) for meas in measurements):
+            raise ValueError("'measurements' must be a non-empty list of paths.")
+
+        if "labels" in request:
+            labels = request["labels"]
+            if labels is not None and (not isinstance(labels, list) or not labels or not all(isinstance(label, str) for label in labels)):
+                raise ValueError("'labels' must be a non-empty list of strings or null to export all labels.")
+        elif "profile" in request:
+            if not isinstance(request["profile"], str):
+                raise ValueError("'profile' must be the name of a profile.")
+            profiles = load_profiles()
+            if request["profile"] not in profiles:
+                raise ValueError("Unknown profile " + str(request["profile"]) + ".")
+            labels = profiles[request["profile"]]["labels"]
+        else:
+            raise ValueError("Either 'profile' or 'labels' must be given.")
+
+        raster = request.get("raster", 0.1)
+        if isinstance(raster, bool) or not isinstance(raster, (int, float)):
+            raise ValueError("'raster' must be a number.")
+        raster = float(raster)
+        if raster <= 0:
+            raise ValueError("'raster' must be greater than 0.")
+
+        method = request.get("method", mdf_export.RASTER_METHODS[0])
+        if not isinstance(method, str) or method not in mdf_export.RASTER_METHODS:
+            raise ValueError("'method' must be one of " + ",".join(mdf_export.RASTER_METHODS) + ".")
+
+        formats = request.get("formats", ["excel"])
+        if not isinstance(formats, list) or not formats or \
+                any(not isinstance(export_format, str) or export_format not in mdf_export.EXPORT_FORMATS for export_format in formats):
+            raise ValueError("'formats' must be a list of " + ",".join(mdf_export.EXPORT_FORMATS) + ".")
+
+        raw = request.get("raw", False)
+        if not isinstance(raw, bool):
+            raise ValueError("'raw' must be true or false.")
+
+        output_path = request.get("output_path")
+        if output_path is not None and not isinstance(output_path, str):
+            raise ValueError("'output_path' must be a path.")
+        if output_path is not None and not os.path.isdir(output_path):
+            raise ValueError("The output path " + str(output_path) + " does not exist.")
+
+        self.id = uuid.uuid4().hex
+        self.measurements = measurements
+        self.labels = labels
+        self.raster = raster
+        self.method = method
+        self.formats = formats
+        self.raw = raw
+        self.output_path = output_path
+        self.status = "queued"
+        self.progress = 0
+        self.current = None
+        self.outputs = []
+        self.errors = {}
+        self.created = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.finished = None
+        self.lock = threading.Lock()
+
+    def run(self, service: "ConversionService"):
+        """Converts all measurements of the job one after another. The output files contain the
+           job id, so jobs on the same measurement never write the same file.
+
+        Args:
+            service (ConversionService): Service which tracks the measurements in use
+        """
+        with self.lock:
+            self.status = "running"
+        for meas in self.measurements:
+            with self.lock:
+                self.current = meas
+            out_dir = self.output_path or os.path.dirname(meas)
+            out_file = os.path.join(out_dir, os.path.splitext(os.path.basename(meas))[0] + ("_export_raw_" if self.raw else "_export_") + self.id)
+            service.acquire_measurement(meas)
+            try:
+                if self.raw:
+                    outputs = raw_conversion.export_raw_measurement(meas, self.labels, self.raster, self.formats, out_file)
+                else:
+                    outputs = mdf_export.export_measurement(meas, self.labels, self.raster, self.formats, out_file, self.method)
+                with self.lock:
+                    self.outputs.extend(outputs)
+            except Exception as e:
+                self.add_error(meas, str(e))
+            finally:
+                service.release_measurement(meas)
+            with self.lock:
+                self.progress += 1
+        with self.lock:
+            self.current = None
+            self.status = "failed" if self.errors else "finished"
+            self.finished = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def add_error(self, key: str, error: str):
+        """Records an error of the job
+
+        Args:
+            key (str): Measurement or "job" for errors of the whole job
+            error (str): Error message
+        """
+        with self.lock:
+            self.errors[key] = error
+            if key == "job":
+                self.status = "failed"
+
+    def output(self, number: int) -> str:
+        """Returns the path to an output file of the job
+
+        Args:
+            number (int): Index of the output file
+
+        Returns:
+            str: Path to the output file, None if the job has no output with this index
+        """
+        with self.lock:
+            return self.outputs[number] if number < len(self.outputs) else None
+
+    def to_dict(self) -> dict:
+        """Returns a copy of the status of the job, which can be serialized while the job is running
+
+        Returns:
+            dict: Json serializable status
+        """
+        with self.lock:
+            return {
+                "id": self.id,
+                "status": self.status,
+                "progress": self.progress,
+                "total": len(self.measurements),
+                "current": self.current,
+                "outputs": list(self.outputs),
+                "errors": dict(self.errors),
+                "created": self.created,
+                "finished": self.finished,
+            }
+
+
+class ConversionService:
+    """Pool of worker threads which process the submitted jobs from a bounded queue
+    """
+
+    def __init__(self, workers: int = WORKERS, queue_size: int = QUEUE_SIZE):
+        """Initialize function of the class ConversionService. Starts the worker threads
+
+        Args:
+            workers (int, optional): Number of worker threads. Defaults to WORKERS.
+            queue_size (int, optional): Maximum number of waiting jobs. Defaults to QUEUE_SIZE.
+        """
+        self.jobs = {}
+        self.active = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.threads = [threading.Thread(target=self.worker, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, job: ConversionJob) -> bool:
+        """Adds a job to the queue
+
+        Args:
+            job (ConversionJob): Job to process
+
+        Returns:
+            bool: False if the queue is full and the job was rejected
+        """
+        with self.lock:
+            try:
+                self.queue.put_nowait(job)
+            except queue.Full:
+                return False
+            self.jobs[job.id] = job
+            self.trim_history()
+        return True
+
+    def trim_history(self):
+        """Removes the oldest finished jobs if more than JOB_HISTORY jobs are stored. Must be called with the lock held
+        """
+        finished = [job_id for job_id, job in self.jobs.items() if job.to_dict()["status"] in ("finished", "failed")]
+        for job_id in finished[:max(0, len(self.jobs) - JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> ConversionJob:
+        """Returns a job by its id
+
+        Args:
+            job_id (str): Id of the job
+
+        Returns:
+            ConversionJob: The job, None if the id is unknown
+        """
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def all_jobs(self) -> list:
+        """Returns the status of all jobs
+
+        Returns:
+            list: Status of every job
+        """
+        with self.lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def acquire_measurement(self, meas: str):
+        """Registers a measurement which is converted by a job
+
+        Args:
+            meas (str): Path to measurement
+        """
+        with self.lock:
+            self.active[meas] = self.active.get(meas, 0) + 1
+
+    def release_measurement(self, meas: str):
+        """Unregisters a converted measurement. The temporary files of the MdfTransformer are deleted once
+           no running job uses a measurement whose temporary files match the same file name pattern
+
+        Args:
+            meas (str): Path to measurement
+        """
+        with self.lock:
+            self.active[meas] -= 1
+            if self.active[meas] == 0:
+                del self.active[meas]
+            name = os.path.splitext(os.path.basename(meas))[0]
+            if any(os.path.basename(other).startswith(name) for other in self.active):
+                return
+            try:
+                mdf_export.delete_temp_files(meas)
+            except OSError:
+                pass
+
+    def worker(self):
+        """Processes jobs from the queue until None is received
+        """
+        while True:
+            job = self.queue.get()
+            if job is None:
+                self.queue.task_done()
+                break
+            try:
+                job.run(self)
+            except Exception as e:
+                job.add_error("job", str(e))
+            self.queue.task_done()
+
+    def shutdown(self):
+        """Waits for the submitted jobs and stops the worker threads
+        """
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """Handles the HTTP requests of the service
+    """
+
+    def do_GET(self):
+        """Handles status, download and profile requests
+        """
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        service = self.server.service
+
+        if parts == ["jobs"]:
+            self.send_json(200, service.all_jobs())
+        elif parts == ["profiles"]:
+            self.send_json(200, load_profiles())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = service.get(parts[1])
+            if job is None:
+                self.send_json(404, {"error": "Unknown job " + parts[1]})
+            else:
+                self.send_json(200, job.to_dict())
+        elif len(parts) == 4 and parts[0] == "jobs" and parts[2] == "outputs":
+            job = service.get(parts[1])
+            if job is None:
+                self.send_json(404, {"error": "Unknown job " + parts[1]})
+            elif not parts[3].isdigit() or job.output(int(parts[3])) is None:
+                self.send_json(404, {"error": "Unknown output " + parts[3]})
+            else:
+                self.send_file(job.output(int(parts[3])))
+        else:
+            self.send_json(404, {"error": "Unknown path " + self.path})
+
+    def do_POST(self):
+        """Handles the submission of jobs
+        """
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        if parts != ["jobs"]:
+            self.send_json(404, {"error": "Unknown path " + self.path})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("The request body must be a json object.")
+            job = ConversionJob(request)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            # Unexpected errors are answered as well, so the client never loses the connection without response
+            self.send_json(500, {"error": str(e)})
+            return
+
+        if self.server.service.submit(job):
+            self.send_json(202, job.to_dict())
+        else:
+            self.send_json(503, {"error": "The job queue is full. Please try again later."}, {"Retry-After": str(RETRY_AFTER)})
+
+    def send_json(self, status: int, data, headers: dict = None):
+        """Sends a json response
+
+        Args:
+            status (int): HTTP status code
+            data (_type_): Json serializable response
+            headers (dict, optional): Additional headers. Defaults to None.
+        """
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, path: str):
+        """Sends an output file
+
+        Args:
+            path (str): Path to the file
+        """
+        if not os.path.exists(path):
+            self.send_json(404, {"error": "The output file " + path + " does not exist anymore."})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", 'attachment; filename="' + os.path.basename(path) + '"')
+        self.end_headers()
+        with open(path, 'rb') as file:
+            shutil.copyfileobj(file, self.wfile)
+
+    def log_message(self, format, *args):
+        """Writes the requests to the log output
+        """
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        sys.stdout.write(f"\n{timestamp} {self.address_string()} {format % args}")
+
+
+def create_server(host: str = HOST, port: int = PORT, workers: int = WORKERS, queue_size: int = QUEUE_SIZE) -> ThreadingHTTPServer:
+    """Creates the HTTP server with its conversion service. Port 0 selects a free port
+
+    Args:
+        host (str, optional): Address of the server. Defaults to HOST.
+        port (int, optional): Port of the server. Defaults to PORT.
+        workers (int, optional): Number of worker threads. Defaults to WORKERS.
+        queue_size (int, optional): Maximum number of waiting jobs. Defaults to QUEUE_SIZE.
+
+    Returns:
+        ThreadingHTTPServer: Server, started with serve_forever
+    """
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.service = ConversionService(workers, queue_size)
+    return server
+
+
+def main():
+    """Starts the service until it is stopped with Ctrl+C
+    """
+    parser = argparse.ArgumentParser(description="Local HTTP service for the conversion of measurements")
+    parser.add_argument("--port", type=int, default=PORT, help="port of the service")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="number of jobs converted in parallel")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE, help="number of jobs which can wait for a worker")
+    args = parser.parse_args()
+
+    server = create_server(HOST, args.port, args.workers, args.queue_size)
+    sys.stdout.write(f"\nConversion service running on http://{HOST}:{server.server_address[1]}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+        mdf_cache.close_all()
+        mdf_export.shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
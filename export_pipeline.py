@@ -0,0 +1,155 @@
+"""export_pipeline.py
+
+   Runs the export in stages connected by bounded queues, so the conversion of the next
+   measurement overlaps with writing the current one
+
+   @file export_pipeline.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import time
+import queue
+import threading
+
+
+QUEUE_SIZE = 1      # Number of items which can wait between two stages
+
+_STOP = object()    # Sentinel which ends the workers of a stage
+
+
+class Stage:
+    """Step of the pipeline which is executed by one or more worker threads
+    """
+
+    def __init__(self, name: str, function, workers: int = 1):
+        """Initialize function of the class Stage
+
+        Args:
+            name (str): Name of the stage for the status and the utilization
+            function (callable): Called with the result of the previous stage, returns the input of the next stage
+            workers (int, optional): Number of worker threads. Defaults to 1.
+        """
+        self.name = name
+        self.function = function
+        self.workers = max(1, int(workers))
+        self.busy = 0.0
+        self.lock = threading.Lock()
+        self.running = 0
+
+
+class Pipeline:
+    """Passes every item through all stages. The stages run concurrently, the queues between them
+       are bounded so a fast stage waits for a slow one instead of filling the memory.
+       Progress is reported through the events queue, which is read by the caller.
+
+       Events are tuples (kind, index, stage name, value) with kind "started", "done" or "error".
+    """
+
+    def __init__(self, stages: list, queue_size: int = QUEUE_SIZE):
+        """Initialize function of the class Pipeline
+
+        Args:
+            stages (list): Stages in the order of execution
+            queue_size (int, optional): Maximum number of items between two stages. Defaults to QUEUE_SIZE.
+        """
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.events = queue.Queue()
+        self.threads = []
+        self.start_time = None
+        self.stop_time = None
+
+    def start(self, items: list):
+        """Starts the worker threads and feeds the items into the first stage
+
+        Args:
+            items (list): Inputs of the first stage
+        """
+        self.start_time = time.perf_counter()
+        for position, stage in enumerate(self.stages):
+            stage.running = stage.workers
+            for _ in range(stage.workers):
+                self.threads.append(threading.Thread(target=self.worker, args=(position,), daemon=True))
+        self.threads.append(threading.Thread(target=self.feed, args=(items,), daemon=True))
+        for thread in self.threads:
+            thread.start()
+
+    def feed(self, items: list):
+        """Puts the items into the queue of the first stage
+
+        Args:
+            items (list): Inputs of the first stage
+        """
+        for index, item in enumerate(items):
+            self.queues[0].put((index, item))
+        for _ in range(self.stages[0].workers):
+            self.queues[0].put(_STOP)
+
+    def worker(self, position: int):
+        """Processes items of a stage until the stop sentinel is received
+
+        Args:
+            position (int): Position of the stage in the pipeline
+        """
+        stage = self.stages[position]
+        last = position == len(self.stages) - 1
+        while True:
+            entry = self.queues[position].get()
+            if entry is _STOP:
+                break
+            index, item = entry
+            self.events.put(("started", index, stage.name, None))
+            start = time.perf_counter()
+            try:
+                result = stage.function(item)
+            except Exception as e:
+                self.add_busy(stage, start)
+                self.events.put(("error", index, stage.name, e))
+                continue
+            self.add_busy(stage, start)
+            if last:
+                self.events.put(("done", index, stage.name, result))
+            else:
+                self.queues[position + 1].put((index, result))
+
+        with stage.lock:
+            stage.running -= 1
+            finished = stage.running == 0
+        if finished:
+            if last:
+                self.stop_time = time.perf_counter()
+            else:
+                for _ in range(self.stages[position + 1].workers):
+                    self.queues[position + 1].put(_STOP)
+
+    def add_busy(self, stage: Stage, start: float):
+        """Adds the processing time of an item to the busy time of the stage
+
+        Args:
+            stage (Stage): Stage which processed the item
+            start (float): Start time of the processing
+        """
+        with stage.lock:
+            stage.busy += time.perf_counter() - start
+
+    def is_alive(self) -> bool:
+        """Checks if the pipeline is still running
+
+        Returns:
+            bool: True as long as a worker thread is running
+        """
+        return any(thread.is_alive() for thread in self.threads)
+
+    def utilization(self) -> dict:
+        """Returns the share of the run time in which the workers of each stage were busy
+
+        Returns:
+            dict: Utilization between 0 and 1 for every stage
+        """
+        if self.start_time is None:
+            return {stage.name: 0.0 for stage in self.stages}
+        wall = (self.stop_time or time.perf_counter()) - self.start_time
+        return {stage.name: stage.busy / (wall * stage.workers) if wall > 0 else 0.0 for stage in self.stages}
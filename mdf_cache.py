@@ -0,0 +1,248 @@
+"""mdf_cache.py
+
+   Keeps opened measurements while they are used, so every file is parsed only once.
+   Additional handles for the parallel decoding are kept with the measurement and reused.
+   Measurements which were not used for IDLE_TIMEOUT seconds are closed again, so the
+   files can be moved, replaced or deleted while the tool is running
+
+   @file mdf_cache.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import asammdf
+
+
+CACHE_SIZE = 4      # Maximum number of measurements which are kept open
+IDLE_TIMEOUT = 30   # Seconds after which an unused measurement is closed
+
+_CACHE = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+_SWEEPER = None
+
+
+class _CacheEntry:
+    """Opened measurement with the file state at the time of opening
+    """
+
+    def __init__(self, path: str, state: tuple):
+        """Initialize function of the class _CacheEntry. The measurement is parsed on first use
+
+        Args:
+            path (str): Path to measurement
+            state (tuple): Size and modification time of the file
+        """
+        self.path = path
+        self.state = state
+        self.lock = threading.RLock()
+        self.mdf = None
+        self.closed = False
+        self.spares = []
+        self.spare_lock = threading.Lock()
+        self.users = 0
+        self.last_used = time.monotonic()
+
+    def open(self) -> asammdf.MDF:
+        """Parses the measurement if this was not done yet. Must be called with the lock held
+
+        Returns:
+            asammdf.MDF: Opened measurement
+        """
+        if self.mdf is None:
+            self.mdf = asammdf.MDF(self.path)
+        return self.mdf
+
+    def take_spare(self) -> asammdf.MDF:
+        """Takes an unused additional handle of the measurement
+
+        Returns:
+            asammdf.MDF: Opened measurement, None if no unused handle is available
+        """
+        with self.spare_lock:
+            return self.spares.pop() if self.spares else None
+
+    def put_spare(self, mdf: asammdf.MDF) -> bool:
+        """Returns an additional handle for later use
+
+        Args:
+            mdf (asammdf.MDF): Opened measurement
+
+        Returns:
+            bool: False if the entry is closed and the handle has to be closed by the caller
+        """
+        with self.spare_lock:
+            if self.closed:
+                return False
+            self.spares.append(mdf)
+            return True
+
+    def close(self):
+        """Closes the measurement and its additional handles as soon as they are no longer in use
+        """
+        with self.spare_lock:
+            self.closed = True
+            spares, self.spares = self.spares, []
+        for mdf in spares:
+            mdf.close()
+        with self.lock:
+            if self.mdf is not None:
+                self.mdf.close()
+                self.mdf = None
+
+
+def _file_state(path: str) -> tuple:
+    """Returns size and modification time of a file to detect changes
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        tuple: Size and modification time
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _acquire(path: str) -> _CacheEntry:
+    """Returns the cache entry of a measurement and registers a user. If the file changed since it was
+       opened, a new entry is created. The least recently used entries are closed if more than
+       CACHE_SIZE measurements are open. Must be followed by _release
+
+    Args:
+        path (str): Path to measurement
+
+    Returns:
+        _CacheEntry: Entry of the measurement
+    """
+    key = os.path.normcase(os.path.abspath(path))
+    state = _file_state(path)
+    evicted = []
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None and entry.state != state:
+            evicted.append(_CACHE.pop(key))
+            entry = None
+        if entry is None:
+            entry = _CacheEntry(path, state)
+            _CACHE[key] = entry
+        _CACHE.move_to_end(key)
+        entry.users += 1
+        while len(_CACHE) > CACHE_SIZE:
+            evicted.append(_CACHE.popitem(last=False)[1])
+
+    for old_entry in evicted:
+        old_entry.close()
+    return entry
+
+
+@contextmanager
+def use_mdf(path: str):
+    """Provides the opened measurement from the cache or opens it. The measurement is locked for
+       other threads while it is in use. If the file changed since it was opened, it is opened again.
+       The least recently used measurement is closed if more than CACHE_SIZE measurements are open.
+
+    Args:
+        path (str): Path to measurement
+
+    Yields:
+        asammdf.MDF: Opened measurement
+    """
+    entry = _acquire(path)
+    try:
+        with entry.lock:
+            if not entry.closed:
+                yield entry.open()
+                return
+        # The entry was evicted while waiting for it, use a handle of its own
+        mdf = asammdf.MDF(path)
+        try:
+            yield mdf
+        finally:
+            mdf.close()
+    finally:
+        _release(entry)
+
+
+@contextmanager
+def use_spare_mdf(path: str):
+    """Provides an additional handle of the measurement for the parallel decoding. In contrast to
+       use_mdf several threads can use the measurement at the same time, every one with its own handle.
+       The handles are kept with the cached measurement, so the header is parsed once per handle and
+       not once per use. They are closed together with the measurement.
+
+    Args:
+        path (str): Path to measurement
+
+    Yields:
+        asammdf.MDF: Opened measurement which is used by no other thread
+    """
+    entry = _acquire(path)
+    try:
+        mdf = entry.take_spare()
+        if mdf is None:
+            mdf = asammdf.MDF(path)
+        try:
+            yield mdf
+        finally:
+            if not entry.put_spare(mdf):
+                mdf.close()
+    finally:
+        _release(entry)
+
+
+def _release(entry: _CacheEntry):
+    """Marks the end of a use of a cached measurement and schedules the closing of idle measurements
+
+    Args:
+        entry (_CacheEntry): Used entry
+    """
+    global _SWEEPER
+    with _CACHE_LOCK:
+        entry.users -= 1
+        entry.last_used = time.monotonic()
+        if _SWEEPER is None:
+            _SWEEPER = threading.Timer(IDLE_TIMEOUT, close_idle)
+            _SWEEPER.daemon = True
+            _SWEEPER.start()
+
+
+def close_idle():
+    """Closes the measurements which were not used for IDLE_TIMEOUT seconds. Runs in a timer thread
+       as long as measurements are open
+    """
+    global _SWEEPER
+    now = time.monotonic()
+    idle = []
+    with _CACHE_LOCK:
+        for key, entry in list(_CACHE.items()):
+            if entry.users == 0 and now - entry.last_used >= IDLE_TIMEOUT:
+                idle.append(_CACHE.pop(key))
+        if _CACHE:
+            _SWEEPER = threading.Timer(IDLE_TIMEOUT, close_idle)
+            _SWEEPER.daemon = True
+            _SWEEPER.start()
+        else:
+            _SWEEPER = None
+    for entry in idle:
+        entry.close()
+
+
+def close_all():
+    """Closes all cached measurements
+    """
+    global _SWEEPER
+    with _CACHE_LOCK:
+        entries = list(_CACHE.values())
+        _CACHE.clear()
+        if _SWEEPER is not None:
+            _SWEEPER.cancel()
+            _SWEEPER = None
+    for entry in entries:
+        entry.close()
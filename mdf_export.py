@@ -0,0 +1,710 @@
+"""mdf_export.py
+
+   Reads the measurements and converts the selected labels independent of the GUI
+
+   @file mdf_export.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import tempfile
+import threading
+from glob import glob
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from pandas import DataFrame, to_numeric
+from scipy.io import savemat
+from ai_utils.Mdf_transformer import mdf_transformer
+import asammdf
+
+import mdf_cache
+from batch_manifest import atomic_output
+
+
+TEMP_PATH = r"C:\temp"            # Path for the temporary files of the MdfTransformer
+EXCEL_MAX_ROWS = 1048576          # Maximum number of rows of an Excel sheet
+RASTER_METHODS = ["interpolate", "mean", "min", "max", "last"]  # Methods to bring the labels to the raster
+EXPORT_FORMATS = {"excel": ".xlsx", "matlab": ".mat"}            # Export formats and their file extension
+PREVIEW_POINTS = 2000             # Number of points per label in the preview
+PREVIEW_LABELS = 8                # Maximum number of labels which are decoded for the preview
+DECODE_WORKERS = os.cpu_count() or 1  # Number of workers which decode the channel groups of one measurement
+DECODE_EXECUTOR = "thread"        # "thread" or "process" pool for the decoding, sized DECODE_WORKERS
+DEFAULT_DECODE_WORKERS = 1        # Workers per measurement if not set, every further worker parses the header once more
+
+_EXECUTORS = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def extract_signal_labels(measurement: str) -> list:
+    """Extracts all labels in the measurement to a list
+
+    Args:
+        measurement (str): Path to measurement
+
+    Returns:
+        list: All signals present in the measurement
+    """
+    all_channels = []
+    with mdf_cache.use_mdf(measurement) as mdf:
+        for group in mdf.groups:
+            for channel in group.channels:
+                if 'time' not in channel.name.split('\\')[0] and '$' not in channel.name.split('\\')[0]:
+                    all_channels.append(channel.name.split('\\')[0])
+    return all_channels
+
+
+def validate_labels(measurements: list, labels: list) -> tuple:
+    """Checks the labels against the channel database of every measurement. Only the header of the
+       measurements is read, no samples are decoded.
+
+    Args:
+        measurements (list): Paths to the measurements
+        labels (list): Labels which should be exported
+
+    Returns:
+        tuple: Missing labels per measurement and error messages of measurements which could not be read
+    """
+    missing = {}
+    errors = {}
+    for meas in measurements:
+        try:
+            available = set(available_labels(meas, labels))
+        except Exception as e:
+            errors[meas] = str(e)
+            continue
+        missing_labels = [label for label in labels if label not in available]
+        if missing_labels:
+            missing[meas] = missing_labels
+    return missing, errors
+
+
+def channel_location(mdf: asammdf.MDF, label: str) -> tuple:
+    """Finds the group and channel index of a label. The first occurrence is used if the label exists several times
+
+    Args:
+        mdf (asammdf.MDF): Opened measurement
+        label (str): Name of the label
+
+    Returns:
+        tuple: Group and channel index, None if the label is not included in the measurement
+    """
+    if label not in mdf.channels_db:
+        return None
+    return mdf.channels_db[label][0]
+
+
+def available_labels(meas: str, labels: list) -> list:
+    """Returns the labels which are included in the measurement. Only the header is read and in contrast
+       to extract_signal_labels no label is filtered by its name
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels to look for
+
+    Returns:
+        list: Labels included in the measurement in the order of the input
+    """
+    with mdf_cache.use_mdf(meas) as mdf:
+        return [label for label in labels if channel_location(mdf, label) is not None]
+
+
+def signals_to_dataframe(meas: str, labels: list, raster: float, method: str = "interpolate", workers: int = DEFAULT_DECODE_WORKERS) -> DataFrame:
+    """Converts the input signals of the measurement to a pandas DataFrame
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels which should be exported
+        raster (float): Raster of the exported time axis in seconds
+        method (str, optional): One of RASTER_METHODS. Defaults to "interpolate".
+        workers (int, optional): Number of parallel workers for the decoding of the native samples. Defaults to DEFAULT_DECODE_WORKERS.
+
+    Returns:
+        DataFrame: All values of the selected signals
+    """
+    if method != "interpolate":
+        return reduce_to_dataframe(meas, labels, raster, method, workers)
+
+    dataset = mdf_transformer.MdfTransformer(meas_paths=meas, interpol_raster=raster, signals=labels)
+
+    df_data = dataset.process(out_path=TEMP_PATH, single_export=["DataFrame"], multiple_export=["MDF"])
+
+    df_data = df_data.droplevel(0)
+    df_data.reset_index(inplace=True)
+    df_data.rename(columns={'timestamps': 'time'}, inplace=True)
+    return df_data
+
+
+def bucket_reduce(timestamps: np.ndarray, samples: np.ndarray, start: float, raster: float, n_buckets: int, method: str) -> np.ndarray:
+    """Reduces the native samples of a label to one value per raster interval.
+       Interval k contains all samples with start + k*raster <= t < start + (k+1)*raster.
+       Intervals without samples hold the value of the previous interval. Text values are decoded to str
+       and always reduced with "last".
+
+    Args:
+        timestamps (np.ndarray): Sorted timestamps of the samples
+        samples (np.ndarray): Samples of the label
+        start (float): Start time of the first interval
+        raster (float): Length of the intervals in seconds
+        n_buckets (int): Number of intervals
+        method (str): "mean", "min", "max" or "last"
+
+    Returns:
+        np.ndarray: One value per interval, NaN before the first sample
+    """
+    numeric = samples.dtype.kind in "biuf"
+    result = np.full(n_buckets, np.nan) if numeric else np.full(n_buckets, np.nan, dtype=object)
+    if len(samples) == 0:
+        return result
+    if not numeric:
+        method = "last"
+
+    buckets = np.floor((timestamps - start) / raster + 1e-9).astype(np.int64)
+    np.clip(buckets, 0, n_buckets - 1, out=buckets)
+    first = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ids = buckets[first]
+
+    if method == "mean":
+        values = np.add.reduceat(samples.astype(np.float64), first) / np.diff(np.r_[first, len(samples)])
+    elif method == "min":
+        values = np.minimum.reduceat(samples, first)
+    elif method == "max":
+        values = np.maximum.reduceat(samples, first)
+    elif method == "last":
+        values = samples[np.r_[first[1:], len(samples)] - 1]
+        if not numeric:
+            values = np.array([decode_text(value) for value in values.tolist()], dtype=object)
+    else:
+        raise ValueError("Unknown raster method " + method)
+    result[ids] = values
+
+    filled = np.zeros(n_buckets, dtype=bool)
+    filled[ids] = True
+    hold = np.maximum.accumulate(np.where(filled, np.arange(n_buckets), 0))
+    result = result[hold]
+    result[:ids[0]] = np.nan
+    return result
+
+
+def decode_text(value):
+    """Converts a text value of a channel or of a value to text conversion to str
+
+    Args:
+        value (_type_): Sample or converted value
+
+    Returns:
+        _type_: str for texts, otherwise the value
+    """
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace").strip("\x00")
+    return value
+
+
+def _group_size(mdf: asammdf.MDF, group: int) -> int:
+    """Estimates the size of the data of a channel group to balance the work between the workers
+
+    Args:
+        mdf (asammdf.MDF): Opened measurement
+        group (int): Index of the channel group
+
+    Returns:
+        int: Number of bytes of the records of the group, 1 if unknown
+    """
+    channel_group = mdf.groups[group].channel_group
+    return max(1, getattr(channel_group, "cycles_nr", 1) * getattr(channel_group, "samples_byte_nr", 1))
+
+
+def _decode_groups(meas: str, entries: list, raw: bool = False) -> list:
+    """Decodes the labels of some channel groups. Executed in the workers with an additional handle
+       from the MDF cache, which is reused by later calls instead of parsing the header again
+
+    Args:
+        meas (str): Path to measurement
+        entries (list): Label, group and channel index of every label to decode
+        raw (bool, optional): Return the raw samples without conversion. Defaults to False.
+
+    Returns:
+        list: Label, timestamps and samples in the order of the entries
+    """
+    with mdf_cache.use_spare_mdf(meas) as mdf:
+        signals = mdf.select([(None, group, index) for _, group, index in entries], raw=raw)
+        return [(label, signal.timestamps, signal.samples) for (label, _, _), signal in zip(entries, signals)]
+
+
+def _decode_executor(executor: str):
+    """Returns the pool for the decoding. There is one pool per executor type with DECODE_WORKERS
+       workers, which is kept for the session and shared by all calls
+
+    Args:
+        executor (str): "thread" or "process"
+
+    Returns:
+        concurrent.futures.Executor: Pool of workers
+    """
+    with _EXECUTORS_LOCK:
+        if executor not in _EXECUTORS:
+            if executor == "process":
+                _EXECUTORS[executor] = ProcessPoolExecutor(max_workers=DECODE_WORKERS)
+            else:
+                _EXECUTORS[executor] = ThreadPoolExecutor(max_workers=DECODE_WORKERS)
+        return _EXECUTORS[executor]
+
+
+def shutdown_executors():
+    """Stops the pools of the decoding
+    """
+    with _EXECUTORS_LOCK:
+        for pool in _EXECUTORS.values():
+            pool.shutdown()
+        _EXECUTORS.clear()
+
+
+def read_native_signals(meas: str, labels: list, workers: int = DEFAULT_DECODE_WORKERS, executor: str = DECODE_EXECUTOR, raw: bool = False) -> dict:
+    """Reads the native samples of the labels. The channel groups are split into chunks of similar
+       size which are decompressed and decoded in parallel. The first chunk is decoded with the cached
+       handle in the calling thread, the other workers use additional handles which are kept in the
+       MDF cache, so the header is parsed once per additional worker and not again for every call.
+       The result keeps the order of the labels.
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels which should be read
+        workers (int, optional): Number of chunks which are decoded in parallel, at most DECODE_WORKERS + 1 at a time. Defaults to DEFAULT_DECODE_WORKERS.
+        executor (str, optional): "thread" or "process". Defaults to DECODE_EXECUTOR.
+        raw (bool, optional): Return the raw samples without conversion. Defaults to False.
+
+    Returns:
+        dict: Timestamps and samples of every label included in the measurement
+    """
+    with mdf_cache.use_mdf(meas) as mdf:
+        groups = OrderedDict()
+        for label in dict.fromkeys(labels):
+            location = channel_location(mdf, label)
+            if location is not None:
+                groups.setdefault(location[0], []).append((label, location[0], location[1]))
+        chunks = [[] for _ in range(max(1, min(workers, len(groups))))]
+        loads = [0] * len(chunks)
+        for group in sorted(groups, key=lambda group: _group_size(mdf, group), reverse=True):
+            smallest = loads.index(min(loads))
+            chunks[smallest].extend(groups[group])
+            loads[smallest] += _group_size(mdf, group)
+
+        others = []
+        if len(chunks) > 1:
+            pool = _decode_executor(executor)
+            others = pool.map(_decode_groups, [meas] * (len(chunks) - 1), chunks[1:], [raw] * (len(chunks) - 1))
+        entries = chunks[0]
+        selected = mdf.select([(None, group, index) for _, group, index in entries], raw=raw) if entries else []
+        decoded = [(label, signal.timestamps, signal.samples) for (label, _, _), signal in zip(entries, selected)]
+
+    decoded += [entry for result in others for entry in result]
+
+    signals = {label: (timestamps, samples) for label, timestamps, samples in decoded}
+    return OrderedDict((label, signals[label]) for label in dict.fromkeys(labels) if label in signals)
+
+
+def channel_conversions(meas: str, labels: list) -> dict:
+    """Returns the conversion rules of the labels from the header of the measurement
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels of the measurement
+
+    Returns:
+        dict: Conversion of every label included in the measurement, None for labels without conversion
+    """
+    conversions = OrderedDict()
+    with mdf_cache.use_mdf(meas) as mdf:
+        for label in dict.fromkeys(labels):
+            location = channel_location(mdf, label)
+            if location is not None:
+                conversions[label] = mdf.groups[location[0]].channels[location[1]].conversion
+    return conversions
+
+
+def reduce_to_dataframe(meas: str, labels: list, raster: float, method: str, workers: int = DEFAULT_DECODE_WORKERS) -> DataFrame:
+    """Converts the labels to a DataFrame with one value per raster interval, calculated from all native samples
+       in the interval. In contrast to the interpolation short peaks are kept at coarse rasters.
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels which should be exported
+        raster (float): Raster of the exported time axis in seconds
+        method (str): "mean", "min", "max" or "last"
+        workers (int, optional): Number of parallel workers for the decoding. Defaults to DEFAULT_DECODE_WORKERS.
+
+    Returns:
+        DataFrame: Reduced values of the selected signals
+    """
+    return reduce_signals(read_native_signals(meas, labels, workers), raster, method)
+
+
+def last_sample_index(timestamps: np.ndarray, start: float, raster: float, n_buckets: int) -> np.ndarray:
+    """Returns the index of the last sample up to the end of every raster interval, with the same
+       intervals as bucket_reduce. Intervals without samples hold the index of the previous interval.
+
+    Args:
+        timestamps (np.ndarray): Sorted timestamps of the samples
+        start (float): Start time of the first interval
+        raster (float): Length of the intervals in seconds
+        n_buckets (int): Number of intervals
+
+    Returns:
+        np.ndarray: Index of the sample per interval, -1 before the first sample
+    """
+    buckets = np.floor((timestamps - start) / raster + 1e-9).astype(np.int64)
+    np.clip(buckets, 0, n_buckets - 1, out=buckets)
+    return np.searchsorted(buckets, np.arange(n_buckets), side="right") - 1
+
+
+def raster_axis(signals: dict, raster: float) -> tuple:
+    """Determines the common raster intervals of the labels. Array channels with more than one value
+       per sample are skipped.
+
+    Args:
+        signals (dict): Timestamps and samples of every label from read_native_signals
+        raster (float): Raster of the exported time axis in seconds
+
+    Returns:
+        tuple: Signals with one value per sample, start time and number of intervals
+    """
+    signals = OrderedDict((label, (timestamps, samples)) for label, (timestamps, samples) in signals.items() if samples.ndim == 1)
+    if not signals:
+        raise ValueError("None of the selected labels is included in the measurement.")
+    timestamps = [timestamps for timestamps, _ in signals.values() if len(timestamps)]
+    if not timestamps:
+        raise ValueError("The selected labels contain no samples.")
+    start = min(times[0] for times in timestamps)
+    stop = max(times[-1] for times in timestamps)
+    return signals, start, int(np.floor((stop - start) / raster + 1e-9)) + 1
+
+
+def reduce_signals(signals: dict, raster: float, method: str) -> DataFrame:
+    """Reduces the native samples of the labels to one value per raster interval on a common time axis.
+       Array channels with more than one value per sample are skipped.
+
+    Args:
+        signals (dict): Timestamps and samples of every label from read_native_signals
+        raster (float): Raster of the exported time axis in seconds
+        method (str): "mean", "min", "max" or "last"
+
+    Returns:
+        DataFrame: Reduced values of the labels
+    """
+    signals, start, n_buckets = raster_axis(signals, raster)
+    data = {"time": start + np.arange(n_buckets) * raster}
+    for label, (timestamps, samples) in signals.items():
+        data[label] = bucket_reduce(timestamps, samples, start, raster, n_buckets, method)
+    return DataFrame(data)
+
+
+def load_preview_signals(meas: str, labels: list) -> dict:
+    """Reads the native samples of the labels for the preview. Labels with text values are skipped.
+       The samples are kept in their native data type to avoid a copy of every label
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels for the preview
+
+    Returns:
+        dict: Timestamps and samples of every numeric label included in the measurement
+    """
+    signals = OrderedDict()
+    for label, (timestamps, samples) in read_native_signals(meas, labels).items():
+        if samples.dtype.kind in "biuf" and samples.ndim == 1 and len(samples) > 0:
+            signals[label] = (timestamps, samples)
+    return signals
+
+
+def min_max_envelope(timestamps: np.ndarray, samples: np.ndarray, start: float = None, stop: float = None, n_points: int = PREVIEW_POINTS) -> tuple:
+    """Decimates the samples in the time range to a fixed number of points. The minimum and maximum
+       of every interval are kept, so peaks are visible independent of the length of the measurement.
+
+    Args:
+        timestamps (np.ndarray): Sorted timestamps of the samples
+        samples (np.ndarray): Numeric samples
+        start (float, optional): Start of the time range. Defaults to the first timestamp.
+        stop (float, optional): End of the time range. Defaults to the last timestamp.
+        n_points (int, optional): Maximum number of returned points. Defaults to PREVIEW_POINTS.
+
+    Returns:
+        tuple: Timestamps and values of the envelope
+    """
+    first = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+    last = len(timestamps) if stop is None else np.searchsorted(timestamps, stop, side="right")
+    timestamps = timestamps[max(first - 1, 0):min(last + 1, len(timestamps))]
+    samples = samples[max(first - 1, 0):min(last + 1, len(samples))]
+    if len(samples) <= n_points:
+        return timestamps, samples
+
+    n_buckets = n_points // 2
+    edges = np.linspace(0, len(samples), n_buckets + 1).astype(np.int64)[:-1]
+    minimum = np.fmin.reduceat(samples, edges)
+    maximum = np.fmax.reduceat(samples, edges)
+    times = np.repeat(timestamps[edges], 2)
+    values = np.empty(2 * n_buckets)
+    values[0::2] = minimum
+    values[1::2] = maximum
+    return times, values
+
+
+def write_excel(data: DataFrame, path: str):
+    """Writes a table atomically to an Excel file
+
+    Args:
+        data (DataFrame): Table to export
+        path (str): Path to the output file
+    """
+    with atomic_output(path) as temp_path:
+        data.to_excel(temp_path, index=False)
+
+
+def write_matlab(data: DataFrame, path: str):
+    """Writes a table atomically to a Matlab file, each column as a separate variable
+
+    Args:
+        data (DataFrame): Table to export
+        path (str): Path to the output file
+    """
+    data_dict = {}
+    for column in data.columns:
+        data_dict[column] = data[column].values.reshape(-1, 1)
+    with atomic_output(path) as temp_path:
+        savemat(temp_path, data_dict, do_compression=False)
+
+
+def export_measurement(meas: str, labels: list, raster: float, formats: list, out_file: str, method: str = "interpolate") -> list:
+    """Converts a measurement once and writes it in all selected formats
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels which should be exported. If None all labels of the measurement are exported
+        raster (float): Raster of the exported time axis in seconds
+        formats (list): Keys of EXPORT_FORMATS
+        out_file (str): Path to the output file without extension
+        method (str, optional): One of RASTER_METHODS. Defaults to "interpolate".
+
+    Returns:
+        list: Paths to the written output files
+    """
+    if labels is None:
+        labels = extract_signal_labels(meas)
+    data = signals_to_dataframe(meas, labels, raster, method)
+    outputs = []
+    if "excel" in formats:
+        write_excel(data, out_file + EXPORT_FORMATS["excel"])
+        outputs.append(out_file + EXPORT_FORMATS["excel"])
+    if "matlab" in formats:
+        write_matlab(data, out_file + EXPORT_FORMATS["matlab"])
+        outputs.append(out_file + EXPORT_FORMATS["matlab"])
+    return outputs
+
+
+def delete_temp_files(meas: str):
+    """Deletes the temporary files which the MdfTransformer created for a measurement
+
+    Args:
+        meas (str): Path to measurement
+    """
+    for file in glob(TEMP_PATH + "/" + os.path.splitext(os.path.basename(meas))[0] + "*.mf4"):
+        os.remove(file)
+
+
+def merged_columns(label_lists: list, labels: list = None) -> list:
+    """Determines the columns of a merged export from the labels of every measurement
+
+    Args:
+        label_lists (list): List of lists of labels from the measurements
+        labels (list, optional): Selected labels. If None all labels of the measurements are used
+
+    Returns:
+        list: Labels which are present in at least one measurement, in a stable order
+    """
+    available = set(label for sublist in label_lists for label in sublist)
+    if labels is not None:
+        return [label for label in dict.fromkeys(labels) if label in available]
+    return list(dict.fromkeys(label for sublist in label_lists for label in sublist))
+
+
+def merge_measurements(measurements: list, labels: list, raster: float, writers: list, progress=None, method: str = "interpolate") -> dict:
+    """Concatenates the measurements on a continuous time axis and streams them into the writers.
+       Only one measurement is held in memory at a time. Labels which are missing in a
+       measurement are filled with NaN.
+
+    Args:
+        measurements (list): Paths to the measurements in chronological order
+        labels (list): Selected labels. If None all labels of the measurements are exported
+        raster (float): Raster of the exported time axis in seconds
+        writers (list): Writer objects with an open, append, close and discard method
+        progress (callable, optional): Called with the index and path of the measurement before it is converted
+        method (str, optional): One of RASTER_METHODS. Defaults to "interpolate".
+
+    Returns:
+        dict: Missing labels for every measurement
+    """
+    if labels is None:
+        label_lists = [extract_signal_labels(meas) for meas in measurements]
+    else:
+        label_lists = [available_labels(meas, list(dict.fromkeys(labels))) for meas in measurements]
+    columns = merged_columns(label_lists, labels)
+    if not columns:
+        raise ValueError("None of the selected labels is included in the measurements.")
+
+    missing = {}
+    offset = 0.0
+    try:
+        for writer in writers:
+            writer.open(["time"] + columns)
+
+        for i, meas in enumerate(measurements):
+            if progress:
+                progress(i, meas)
+            available = set(label_lists[i])
+            meas_labels = [label for label in columns if label in available]
+            missing[meas] = [label for label in columns if label not in available]
+            if not meas_labels:
+                continue
+
+            data = signals_to_dataframe(meas, meas_labels, raster, method)
+            if data.empty:
+                continue
+            data = data.reindex(columns=["time"] + columns)
+            data["time"] = data["time"] - data["time"].iloc[0] + offset
+            offset = data["time"].iloc[-1] + raster
+
+            for writer in writers:
+                writer.append(data)
+            del data
+
+        for writer in writers:
+            writer.close()
+    finally:
+        for writer in writers:
+            writer.discard()
+    return missing
+
+
+class ExcelMergeWriter:
+    """Writes a merged export row by row to an Excel file without keeping the workbook in memory
+    """
+
+    def __init__(self, path: str):
+        """Initialize function of the class ExcelMergeWriter
+
+        Args:
+            path (str): Path to the output file
+        """
+        self.path = path
+        self.rows = 0
+        self.workbook = None
+        self.sheet = None
+
+    def open(self, columns: list):
+        """Creates the workbook and writes the header
+
+        Args:
+            columns (list): Column names of the export
+        """
+        from openpyxl import Workbook
+
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Sheet1")
+        self.sheet.append(columns)
+        self.rows = 1
+
+    def append(self, data: DataFrame):
+        """Appends the rows of a measurement
+
+        Args:
+            data (DataFrame): Data of one measurement
+        """
+        if self.rows + len(data) > EXCEL_MAX_ROWS:
+            raise ValueError("The merged export exceeds the maximum number of rows of an Excel sheet. Please select a larger raster.")
+        data = data.astype(object).where(data.notna(), None)
+        for row in data.itertuples(index=False, name=None):
+            self.sheet.append(row)
+        self.rows += len(data)
+
+    def close(self):
+        """Saves the workbook
+        """
+        with atomic_output(self.path) as temp_path:
+            self.workbook.save(temp_path)
+        self.discard()
+
+    def discard(self):
+        """Releases the workbook without saving it. Does nothing if the writer is already closed
+        """
+        self.workbook = None
+        self.sheet = None
+
+
+class MatlabMergeWriter:
+    """Writes a merged export to a Matlab file. The columns are buffered on disk
+       and written to the file one after another. Numeric columns are written as
+       double arrays, columns with text values as cell arrays like in write_matlab.
+    """
+
+    def __init__(self, path: str):
+        """Initialize function of the class MatlabMergeWriter
+
+        Args:
+            path (str): Path to the output file
+        """
+        self.path = path
+        self.temp_dir = None
+
+    def open(self, columns: list):
+        """Creates the temporary column buffers
+
+        Args:
+            columns (list): Column names of the export
+        """
+        self.columns = columns
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.buffers = [os.path.join(self.temp_dir.name, str(i) + ".npy") for i in range(len(columns))]
+        self.chunks = [0] * len(columns)
+
+    def append(self, data: DataFrame):
+        """Appends the values of a measurement to the column buffers. Every append adds one array per column
+
+        Args:
+            data (DataFrame): Data of one measurement
+        """
+        for i, (column, buffer) in enumerate(zip(self.columns, self.buffers)):
+            numeric = to_numeric(data[column], errors="coerce")
+            if numeric.isna().sum() == data[column].isna().sum():
+                values = numeric.to_numpy(dtype=np.float64)
+            else:
+                values = data[column].to_numpy(dtype=object)
+            with open(buffer, 'ab') as file:
+                np.save(file, values, allow_pickle=True)
+            self.chunks[i] += 1
+
+    def close(self):
+        """Writes the buffered columns to the Matlab file and removes the buffers
+        """
+        try:
+            with atomic_output(self.path) as temp_path, open(temp_path, 'wb') as file:
+                for column, buffer, chunks in zip(self.columns, self.buffers, self.chunks):
+                    parts = []
+                    if chunks:
+                        with open(buffer, 'rb') as column_file:
+                            parts = [np.load(column_file, allow_pickle=True) for _ in range(chunks)]
+                    if any(part.dtype == object for part in parts):
+                        values = np.concatenate([part.astype(object) for part in parts])
+                    else:
+                        values = np.concatenate(parts) if parts else np.empty(0)
+                    savemat(file, {column: values.reshape(-1, 1)}, do_compression=False)
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Removes the column buffers without writing the Matlab file. Does nothing if the writer is already closed
+        """
+        if self.temp_dir is not None:
+            self.temp_dir.cleanup()
+            self.temp_dir = None
@@ -12,23 +12,32 @@
 import tkinter as tk
 from tkinter import filedialog
 from tkinter import ttk
-from glob import glob
 import os
 import sys
 import re
+import queue
+import threading
+import multiprocessing
 from datetime import datetime
 from pandas import DataFrame
-from scipy.io import savemat
-from ai_utils.Mdf_transformer import mdf_transformer
-import asammdf
 from PIL import Image, ImageTk
 
 import profile_manager
+import mdf_export
+import mdf_cache
+import batch_manifest
+import signal_statistics
+import export_pipeline
+import raw_conversion
 
 
 JSON_PATH = "profiles.json"      # Path to the json file
 LOG_FILE_PATH = "logfile.log"    # Path to the log file
 ICON_PATH  = "icon.ico"          # Path to the icon
+MANIFEST_PATH = "export_manifest.json"  # Path to the manifest of finished export jobs
+CONVERT_WORKERS = 1              # Default number of measurements which are converted or read in parallel
+RESAMPLE_WORKERS = 1             # Default number of measurements which are resampled in parallel
+WRITE_WORKERS = 1                # Default number of measurements which are written in parallel
 
 
 
@@ -43,6 +52,8 @@ class MeasurementGUI(tk.Tk):
         self.all_profiles = profile_manager.load_profiles()
         self.profile_names = self.extract_profile_names(self.all_profiles)
         self.output_paths = [""]
+        self.available_labels = {}
+        self.skipped_meas = set()
 
         try:
             icon = Image.open(ICON_PATH)
@@ -137,9 +148,63 @@ class MeasurementGUI(tk.Tk):
         for i, (text, value) in enumerate(values.items()):
             tk.Radiobutton(self, text=text, variable=self.raster_var, value=value, justify="left").grid(row=9+i, column=2, sticky="w")
 
+        self.options_frame = ttk.LabelFrame(self, text="Options")
+        self.options_frame.grid(row=7, column=2, rowspan=6, sticky="ne", padx=5, pady=5)
+
+        self.merge_checkbox_var = tk.IntVar()
+        self.merge_checkbox = ttk.Checkbutton(self.options_frame, text="Merge all measurements into one file", variable=self.merge_checkbox_var, command=self.options_change)
+        self.merge_checkbox.grid(row=0, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+
+        self.statistics_checkbox_var = tk.IntVar()
+        self.statistics_checkbox = ttk.Checkbutton(self.options_frame, text="Statistics only (min, max, mean, std, percentiles)", variable=self.statistics_checkbox_var, command=self.options_change)
+        self.statistics_checkbox.grid(row=1, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+
+        threshold_label = tk.Label(self.options_frame, text="Threshold", justify="left")
+        threshold_label.grid(row=2, column=0, sticky="w", padx=5, pady=2)
+
+        self.threshold_entry = tk.Entry(self.options_frame, width=10)
+        self.threshold_entry.grid(row=2, column=1, sticky="w", padx=5, pady=2)
+
+        raster_method_label = tk.Label(self.options_frame, text="Raster Method", justify="left")
+        raster_method_label.grid(row=3, column=0, sticky="w", padx=5, pady=2)
+
+        self.raster_method = tk.StringVar()
+        self.raster_method.set(mdf_export.RASTER_METHODS[0])
+        self.raster_method_dropdown = ttk.Combobox(self.options_frame, values=mdf_export.RASTER_METHODS, textvariable=self.raster_method, state="readonly", width=12)
+        self.raster_method_dropdown.grid(row=3, column=1, sticky="w", padx=5, pady=2)
+
+        workers_label = tk.Label(self.options_frame, text="Workers Convert / Resample / Write", justify="left")
+        workers_label.grid(row=4, column=0, sticky="w", padx=5, pady=2)
+
+        workers_frame = tk.Frame(self.options_frame)
+        workers_frame.grid(row=4, column=1, sticky="w", padx=5, pady=2)
+        self.convert_workers_var = tk.IntVar()
+        self.convert_workers_var.set(CONVERT_WORKERS)
+        tk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, width=3, textvariable=self.convert_workers_var, state="readonly").grid(row=0, column=0)
+        self.resample_workers_var = tk.IntVar()
+        self.resample_workers_var.set(RESAMPLE_WORKERS)
+        tk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, width=3, textvariable=self.resample_workers_var, state="readonly").grid(row=0, column=1, padx=(5, 0))
+        self.write_workers_var = tk.IntVar()
+        self.write_workers_var.set(WRITE_WORKERS)
+        tk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, width=3, textvariable=self.write_workers_var, state="readonly").grid(row=0, column=2, padx=(5, 0))
+
+        decode_workers_label = tk.Label(self.options_frame, text="Decode Threads per File", justify="left")
+        decode_workers_label.grid(row=5, column=0, sticky="w", padx=5, pady=2)
+
+        self.decode_workers_var = tk.IntVar()
+        self.decode_workers_var.set(mdf_export.DEFAULT_DECODE_WORKERS)
+        tk.Spinbox(self.options_frame, from_=1, to=os.cpu_count() or 1, width=3, textvariable=self.decode_workers_var, state="readonly").grid(row=5, column=1, sticky="w", padx=5, pady=2)
+
+        self.raw_checkbox_var = tk.IntVar()
+        self.raw_checkbox = ttk.Checkbutton(self.options_frame, text="Raw values with conversion table (last value per raster)", variable=self.raw_checkbox_var, command=self.options_change)
+        self.raw_checkbox.grid(row=6, column=0, columnspan=2, sticky="w", padx=5, pady=2)
+
         self.state_label = tk.Label(self, text="\n\n", wraplength=450)
         self.state_label.grid(row=13, column=2)
 
+        preview_button = tk.Button(self, text="Preview", command=self.open_preview_window)
+        preview_button.grid(row=14, column=2, sticky="e", padx=5, pady=5)
+
         self.export_button = tk.Button(self, text="Export", state="disabled", command=self.start_export)
         self.export_button.grid(row=14, column=4, columnspan=2, sticky="nsew", padx=5, pady=5)
 
@@ -217,6 +282,19 @@ class MeasurementGUI(tk.Tk):
         else:
             self.profile_dropdown.config(state="normal")
 
+    def options_change(self):
+        """Disables the options which cannot be combined. The raw export always uses the last raw value
+           of every raster interval and is not available for the merged and the statistics export
+        """
+        raw = self.raw_checkbox_var.get() == 1
+        self.raster_method_dropdown.config(state="disabled" if raw else "readonly")
+        self.merge_checkbox.config(state="disabled" if raw else "normal")
+        self.statistics_checkbox.config(state="disabled" if raw else "normal")
+        if self.merge_checkbox_var.get() == 1 or self.statistics_checkbox_var.get() == 1:
+            self.raw_checkbox.config(state="disabled")
+        else:
+            self.raw_checkbox.config(state="normal")
+
     def same_path_checkbox_change(self):
         """Disables the output path extry widget if the output path should correspond to the input path
         """
@@ -259,9 +337,7 @@ class MeasurementGUI(tk.Tk):
         """Deletes temporary files which were created during execution
         """
         for meas in self.meas_path:
-            files_to_delete = glob("C:/Temp/" + os.path.splitext(os.path.basename(meas))[0] + "*.mf4")
-            for file in files_to_delete:
-                os.remove(file)
+            mdf_export.delete_temp_files(meas)
 
     def open_new_profile_window(self):
         """Starts the class ProfileNew to create a new profile
@@ -273,6 +349,17 @@ class MeasurementGUI(tk.Tk):
         """
         ProfileEdit(self, self.profile.get(),self.all_profiles[self.profile.get()]["labels"])
 
+    def open_preview_window(self):
+        """Starts the class SignalPreview for the labels of the selected profile in the first measurement
+        """
+        meas = [path for path in self.meas_path if os.path.exists(path)]
+        if not meas:
+            tk.messagebox.showwarning("Warning", "No measurement file has been selected. Please enter a measurement file first")
+        elif self.export_all_checkbutton_var.get() == 0 and self.profile.get() not in self.profile_names:
+            tk.messagebox.showwarning("Warning", "Unknown extraction profile. Please select a valid one")
+        else:
+            SignalPreview(self, meas[0], self.selected_labels(meas[0]))
+
     def update_profiles_dropdown(self, option: str):
         """Updates the profiles in the dropdown menu
 
@@ -292,61 +379,31 @@ class MeasurementGUI(tk.Tk):
         Returns:
             list: All signals present in the measurement
         """
-        mdf = asammdf.MDF(measurement)
-        all_channels = []
-
-        for group in mdf.groups:
-            for channel in group['channels']:
-                if 'time' not in channel.name.split('\\')[0] and '$' not in channel.name.split('\\')[0]:
-                    all_channels.append(channel.name.split('\\')[0])
-        return all_channels
+        return mdf_export.extract_signal_labels(measurement)
 
     def start_export(self):
         """Starts the main part of the tool, the export of the measurements and handles occuring errors
         """
         if self.profile.get() in self.profile_names:
+            if not self.preflight_check():
+                return
             self.grab_set()
-            for i, measurement in enumerate(self.meas_path):
-                write_log_timestamp()
-                if self.excel_checkbox_var.get():
-                    self.update_state_label('Running Meas ' + str(i + 1) + ': ' + ' Excel Export')
-                    try:
-                        data = self.signals_to_dataframe(measurement)
-                        data.to_excel((self.output_paths[i] + "/" + self.output_files[i] + ".xlsx"), index=False)
-                        self.update_state_label('Finished')
-                    except AttributeError as e:
-                        self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'There are no labels available for export.\n' + str(e))
-                    except OSError as e:
-                        if e.errno == 13:
-                            self.update_state_label("Error Meas " + str(i+1) + ": " + "An Excel file with the same name is already opened. Please close the file.")
-                        else:
-                            self.update_state_label(['Error Meas ' + str(i+1) + ': ' + str(e)])
-                    except IndexError as e:
-                        self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'The path to the measurement does not exist.\n' + str(e))
-                    except ValueError as e:
-                        self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'There are no labels available for export.\n' + str(e))
-                    except Exception as e:
-                        self.update_state_label(['Error Meas ' + str(i+1) + ': ' + str(e)])
-
-                if self.matlab_checkbox_var.get():
-                    self.update_state_label('Running Meas ' + str(i + 1) + ': ' + ' Matlab Export')
-                    try:
-                        data = self.signals_to_dataframe(measurement)
-                        data_dict = {}
-                        for column in data.columns:
-                            data_dict[column] = data[column].values.reshape(-1, 1)
-                        savemat(self.output_paths[i] + "/" + self.output_files[i] + ".mat", data_dict, do_compression=False)
-                        self.update_state_label('Finished')
-                    except AttributeError as e:
-                        self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'There are no labels available for export.\n' + str(e))
-                    except IndexError as e:
-                        self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'The path to the measurement does not exist.\n' + str(e))
-                    except ValueError as e:
-                        self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'There are no labels available for export.\n' + str(e))
-                    except Exception as e:
-                        self.update_state_label(['Error Meas ' + str(i+1) + ': ' + str(e)])
-            self.delete_temp_files()
-            self.grab_release()
+            try:
+                if self.statistics_checkbox_var.get():
+                    self.statistics_export()
+                elif self.merge_checkbox_var.get() and len(self.meas_path) > 1:
+                    self.merge_export([meas for meas in self.meas_path if meas not in self.skipped_meas])
+                    self.delete_temp_files()
+                else:
+                    manifest = batch_manifest.BatchManifest(MANIFEST_PATH)
+                    jobs = self.prepare_export_jobs(manifest)
+                    if jobs:
+                        self.run_export_pipeline(jobs, manifest)
+                    self.delete_temp_files()
+            finally:
+                # Release the measurement files, so they can be moved or replaced after the export
+                mdf_cache.close_all()
+                self.grab_release()
         else:
             tk.messagebox.showwarning(
                 "Warning", "Unknown extraction profile. Please select a valid one")
@@ -361,19 +418,261 @@ class MeasurementGUI(tk.Tk):
         Returns:
             DataFrame: All values of the selected signals
         """
+        return mdf_export.signals_to_dataframe(meas, self.selected_labels(meas), self.raster_var.get(), self.raster_method.get())
+
+    def selected_labels(self, meas: str) -> list:
+        """Returns the labels which should be exported from the measurement
+
+        Args:
+            meas (str): Path to measurement
+
+        Returns:
+            list: Labels of the selected profile or all labels in the measurement
+        """
+        if self.export_all_checkbutton_var.get() == 1:
+            return self.extract_signal_labels(meas)
+        if meas in self.available_labels:
+            return self.available_labels[meas]
+        return self.all_profiles[self.profile.get()]["labels"]
+
+    def preflight_check(self) -> bool:
+        """Checks the labels of the profile against the channel list of every measurement before the export.
+           If labels are missing the user can continue without them, skip the affected measurements or abort.
+
+        Returns:
+            bool: False if the export should be aborted
+        """
+        self.available_labels = {}
+        self.skipped_meas = set()
         if self.export_all_checkbutton_var.get() == 1:
-            imp_sgnl = self.extract_signal_labels(meas)
+            return True
+
+        self.update_state_label('Checking labels of the measurements')
+        labels = self.all_profiles[self.profile.get()]["labels"]
+        missing, errors = mdf_export.validate_labels(self.meas_path, labels)
+        self.grab_release()
+        if not missing and not errors:
+            return True
+
+        write_log_timestamp()
+        lines = []
+        for meas, missing_labels in missing.items():
+            lines.append(os.path.basename(meas) + ": " + profile_manager.list_2_str(missing_labels))
+        for meas, error in errors.items():
+            lines.append(os.path.basename(meas) + ": " + error)
+        for line in lines:
+            sys.stdout.write(f"\nPre-flight check: {line}")
+        if len(lines) > 10:
+            lines = lines[:10] + ["... (" + str(len(lines) - 10) + " more, see logfile)"]
+
+        response = tk.messagebox.askyesnocancel("Missing Labels",
+            "The following labels are missing:\n\n" + "\n".join(lines) +
+            "\n\nYes: Continue without the missing labels\nNo: Skip the affected measurements\nCancel: Abort the export")
+        if response is None:
+            self.update_state_label('Export aborted')
+            self.grab_release()
+            return False
+        if response:
+            self.skipped_meas = set(errors)
+            for meas, missing_labels in missing.items():
+                self.available_labels[meas] = [label for label in labels if label not in missing_labels]
+                if not self.available_labels[meas]:
+                    self.skipped_meas.add(meas)
+        else:
+            self.skipped_meas = set(missing) | set(errors)
+        return True
+
+    def prepare_export_jobs(self, manifest: batch_manifest.BatchManifest) -> list:
+        """Collects the export jobs of every measurement. Formats which were already exported with the same settings are skipped
+
+        Args:
+            manifest (batch_manifest.BatchManifest): Manifest of the finished jobs
+
+        Returns:
+            list: One job per measurement with the formats which have to be exported
+        """
+        jobs = []
+        for i, measurement in enumerate(self.meas_path):
+            if measurement in self.skipped_meas:
+                self.update_state_label('Skipped Meas ' + str(i + 1) + ': ' + 'Labels are missing in the measurement.')
+                continue
+            formats = []
+            for export_format, checkbox_var in (("Excel", self.excel_checkbox_var), ("Matlab", self.matlab_checkbox_var)):
+                if not checkbox_var.get():
+                    continue
+                out_file = self.output_paths[i] + "/" + self.output_files[i] + ("_raw" if self.raw_checkbox_var.get() else "") + mdf_export.EXPORT_FORMATS[export_format.lower()]
+                settings = self.export_settings(export_format, out_file)
+                key = batch_manifest.job_key(measurement, settings)
+                if manifest.is_done(key, [out_file]):
+                    self.update_state_label('Skipped Meas ' + str(i + 1) + ': ' + export_format + ' Export already finished')
+                else:
+                    formats.append({"format": export_format, "out_file": out_file, "settings": settings, "key": key})
+            if formats:
+                jobs.append({
+                    "number": i + 1,
+                    "meas": measurement,
+                    "labels": None if self.export_all_checkbutton_var.get() == 1 else self.selected_labels(measurement),
+                    "raster": self.raster_var.get(),
+                    "method": self.raster_method.get(),
+                    "decode_workers": self.decode_workers_var.get(),
+                    "raw": bool(self.raw_checkbox_var.get()),
+                    "formats": formats
+                })
+        return jobs
+
+    def run_export_pipeline(self, jobs: list, manifest: batch_manifest.BatchManifest):
+        """Converts the measurements and writes the output files in a pipeline, the next measurement
+           is converted while the current one is written. Handles occuring errors
+
+        Args:
+            jobs (list): Jobs from prepare_export_jobs
+            manifest (batch_manifest.BatchManifest): Manifest of the finished jobs
+        """
+        if self.raster_method.get() == "interpolate" and not self.raw_checkbox_var.get():
+            stages = [export_pipeline.Stage("Convert", convert_job, self.convert_workers_var.get())]
+        else:
+            stages = [export_pipeline.Stage("Read", read_job, self.convert_workers_var.get()),
+                      export_pipeline.Stage("Resample", resample_job, self.resample_workers_var.get())]
+        pipeline = export_pipeline.Pipeline(stages + [export_pipeline.Stage("Write", write_job, self.write_workers_var.get())])
+        self.export_button.config(state="disabled")
+        errors = []
+        pipeline.start(jobs)
+        while pipeline.is_alive() or not pipeline.events.empty():
+            try:
+                kind, index, stage, value = pipeline.events.get(timeout=0.05)
+            except queue.Empty:
+                self.update()
+                continue
+            job = jobs[index]
+            if kind == "started":
+                write_log_timestamp()
+                self.update_state_label('Running Meas ' + str(job["number"]) + ': ' + stage + ' ' + profile_manager.list_2_str([item["format"] for item in job["formats"]]))
+            elif kind == "done":
+                for item, error in zip(job["formats"], value["errors"]):
+                    if error is None:
+                        manifest.mark_done(item["key"], job["meas"], item["settings"], [item["out_file"]])
+                    else:
+                        errors.append(export_error_message(job["number"], error))
+                        manifest.mark_failed(item["key"], job["meas"], item["settings"], errors[-1])
+                        self.update_state_label(errors[-1])
+            elif kind == "error":
+                errors.append(export_error_message(job["number"], value))
+                for item in job["formats"]:
+                    manifest.mark_failed(item["key"], job["meas"], item["settings"], errors[-1])
+                self.update_state_label(errors[-1])
+
+        utilization = ", ".join(name + " " + str(round(value * 100)) + " %" for name, value in pipeline.utilization().items())
+        sys.stdout.write(f"\nPipeline utilization: {utilization}")
+        if errors:
+            self.update_state_label("\n".join(errors[-3:]) + "\nUtilization: " + utilization)
         else:
-            imp_sgnl = self.all_profiles[self.profile.get()]["labels"]
+            self.update_state_label('Finished\nUtilization: ' + utilization)
+        self.check_enable_export_button("event")
 
-        dataset = mdf_transformer.MdfTransformer(meas_paths=meas, interpol_raster=self.raster_var.get(), signals=imp_sgnl)
+    def export_settings(self, export_format: str, out_file: str) -> dict:
+        """Collects the settings of an export job for the batch manifest
 
-        df_data = dataset.process(out_path=r"C:\temp", single_export=["DataFrame"], multiple_export=["MDF"])
+        Args:
+            export_format (str): Format of the export
+            out_file (str): Path to the output file
 
-        df_data = df_data.droplevel(0)
-        df_data.reset_index(inplace=True)
-        df_data.rename(columns={'timestamps': 'time'}, inplace=True)
-        return df_data
+        Returns:
+            dict: Settings which influence the output file
+        """
+        return {
+            "format": export_format,
+            "output": os.path.abspath(out_file),
+            "labels": "all" if self.export_all_checkbutton_var.get() == 1 else self.all_profiles[self.profile.get()]["labels"],
+            "raster": self.raster_var.get(),
+            "raster_method": "last" if self.raw_checkbox_var.get() else self.raster_method.get(),
+            "raw": bool(self.raw_checkbox_var.get())
+        }
+
+    def statistics_export(self):
+        """Exports the statistics of the selected labels for every measurement and for the whole batch
+        """
+        try:
+            threshold = float(self.threshold_entry.get().replace(",", ".")) if self.threshold_entry.get().strip() else None
+        except ValueError:
+            self.update_state_label('Error Statistics: The threshold must be a number.')
+            return
+
+        batch = {}
+        for i, measurement in enumerate(self.meas_path):
+            write_log_timestamp()
+            if measurement in self.skipped_meas:
+                self.update_state_label('Skipped Meas ' + str(i + 1) + ': ' + 'Labels are missing in the measurement.')
+                continue
+            self.update_state_label('Running Meas ' + str(i + 1) + ': ' + ' Statistics Export')
+            out_file = self.output_paths[i] + "/" + os.path.splitext(os.path.basename(measurement))[0] + "_statistics"
+            try:
+                statistics = signal_statistics.measurement_statistics(measurement, self.selected_labels(measurement), threshold)
+                if not statistics:
+                    raise ValueError("None of the selected labels is included in the measurement.")
+                table = signal_statistics.statistics_table(statistics)
+                if self.excel_checkbox_var.get():
+                    mdf_export.write_excel(table, out_file + ".xlsx")
+                if self.matlab_checkbox_var.get():
+                    mdf_export.write_matlab(table, out_file + ".mat")
+                batch[os.path.basename(measurement)] = statistics
+                self.update_state_label('Finished')
+            except OSError as e:
+                if e.errno == 13:
+                    self.update_state_label("Error Meas " + str(i+1) + ": " + "An Excel file with the same name is already opened. Please close the file.")
+                else:
+                    self.update_state_label('Error Meas ' + str(i+1) + ': ' + str(e))
+            except ValueError as e:
+                self.update_state_label('Error Meas ' + str(i+1) + ': ' + 'There are no labels available for export.\n' + str(e))
+            except Exception as e:
+                self.update_state_label('Error Meas ' + str(i+1) + ': ' + str(e))
+
+        if len(batch) > 1:
+            out_file = self.output_paths[0] + "/statistics_summary"
+            try:
+                table = signal_statistics.batch_statistics_table(batch)
+                if self.excel_checkbox_var.get():
+                    mdf_export.write_excel(table, out_file + ".xlsx")
+                if self.matlab_checkbox_var.get():
+                    mdf_export.write_matlab(table, out_file + ".mat")
+            except Exception as e:
+                self.update_state_label('Error Statistics Summary: ' + str(e))
+
+    def merge_export(self, measurements: list):
+        """Exports all measurements into one file with a continuous time axis and handles occuring errors
+
+        Args:
+            measurements (list): Paths to the measurements in chronological order
+        """
+        write_log_timestamp()
+        if not measurements:
+            self.update_state_label('Error Merge: All measurements were skipped.')
+            return
+        out_file = self.output_paths[0] + "/" + os.path.splitext(os.path.basename(measurements[0]))[0] + "_merged"
+        writers = []
+        if self.excel_checkbox_var.get():
+            writers.append(mdf_export.ExcelMergeWriter(out_file + ".xlsx"))
+        if self.matlab_checkbox_var.get():
+            writers.append(mdf_export.MatlabMergeWriter(out_file + ".mat"))
+        labels = None if self.export_all_checkbutton_var.get() == 1 else self.all_profiles[self.profile.get()]["labels"]
+
+        try:
+            missing = mdf_export.merge_measurements(measurements, labels, self.raster_var.get(), writers,
+                progress=lambda i, meas: self.update_state_label('Running Meas ' + str(i + 1) + ': ' + ' Merged Export'),
+                method=self.raster_method.get())
+            incomplete = [os.path.basename(meas) + ": " + profile_manager.list_2_str(missing_labels) for meas, missing_labels in missing.items() if missing_labels]
+            for line in incomplete:
+                sys.stdout.write(f"\nMissing labels filled with NaN in {line}")
+            if incomplete:
+                self.update_state_label('Finished. Missing labels were filled with NaN:\n' + "\n".join(incomplete))
+            else:
+                self.update_state_label('Finished')
+        except OSError as e:
+            if e.errno == 13:
+                self.update_state_label("Error Merge: An Excel file with the same name is already opened. Please close the file.")
+            else:
+                self.update_state_label('Error Merge: ' + str(e))
+        except Exception as e:
+            self.update_state_label('Error Merge: ' + str(e))
 
     def update_state_label(self, input_text: str):
         """Updates the state label widget to the input string
@@ -555,9 +854,22 @@ class ProfileNew(tk.Toplevel):
             add_button = tk.Button(self, text="Add Signal -->")
             add_button.grid(row=7, column=0, columnspan=2, sticky="nwse", padx=(5, 45), pady=5)
             add_button.bind("<Button-1>", self.select_label)
+
+            preview_button = tk.Button(self, text="Preview Signals", command=self.preview_labels)
+            preview_button.grid(row=8, column=0, columnspan=2, sticky="nwse", padx=(5, 45), pady=5)
         else:
             tk.messagebox.showwarning("Warning", "No measurement file has been selected. Please enter a measurement file first")
 
+    def preview_labels(self):
+        """Shows the labels selected in the list, or all labels of the profile, in the preview window
+        """
+        labels = [self.listbox.get(index) for index in self.listbox.curselection()]
+        if not labels:
+            labels = profile_manager.str_2_list(self.signals_text.get("1.0", "end-1c"))
+        meas = [path for path in app.meas_path if os.path.exists(path)]
+        if labels and meas:
+            SignalPreview(self, meas[0], labels)
+
     def get_non_common_items(self, lists: list) -> list:
         """Get all labels which are not included in all measurements
 
@@ -706,6 +1018,173 @@ class ProfileEdit(ProfileNew):
             self.destroy()
 
 
+class SignalPreview(tk.Toplevel):
+    """Class for the window which plots a min/max envelope of the labels before the export.
+       Drag with the left mouse button to zoom, double click to show the whole measurement.
+
+    Args:
+        tk (tk.Toplevel): Inherited from the class tk.toplevel
+    """
+    COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f"]
+
+    def __init__(self, root, meas: str, labels: list):
+        """Initial function for the class SignalPreview. The samples are loaded in a background thread,
+           only the first mdf_export.PREVIEW_LABELS labels are shown
+
+        Args:
+            root (_type_): Parent window
+            meas (str): Path to measurement
+            labels (list): Labels to plot
+        """
+        super().__init__(root)
+        self.title("Preview - " + os.path.basename(meas))
+        self.geometry("900x600")
+        self.transient(root)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.canvas = tk.Canvas(self, bg="white")
+        self.canvas.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
+        self.canvas.bind("<Configure>", self.draw)
+        self.canvas.bind("<ButtonPress-1>", self.start_zoom)
+        self.canvas.bind("<B1-Motion>", self.drag_zoom)
+        self.canvas.bind("<ButtonRelease-1>", self.end_zoom)
+        self.canvas.bind("<Double-Button-1>", self.reset_zoom)
+
+        self.info_label = tk.Label(self, text="Loading ...", justify="left")
+        self.info_label.grid(row=1, column=0, sticky="w", padx=5, pady=5)
+
+        reset_button = tk.Button(self, text="Reset Zoom", width=10, command=lambda: self.reset_zoom("event"))
+        reset_button.grid(row=1, column=1, sticky="e", padx=5, pady=5)
+
+        self.signals = {}
+        self.labels = list(dict.fromkeys(labels))[:mdf_export.PREVIEW_LABELS]
+        self.omitted = len(dict.fromkeys(labels)) - len(self.labels)
+        self.result = queue.Queue()
+        threading.Thread(target=self.load_signals, args=(meas,), daemon=True).start()
+        self.poll_id = self.after(100, self.poll_signals)
+
+    def load_signals(self, meas: str):
+        """Reads the samples of the labels. Executed in a background thread
+
+        Args:
+            meas (str): Path to measurement
+        """
+        try:
+            self.result.put(mdf_export.load_preview_signals(meas, self.labels))
+        except Exception as e:
+            self.result.put(e)
+
+    def poll_signals(self):
+        """Checks if the samples are loaded and plots them, otherwise checks again later
+        """
+        try:
+            result = self.result.get_nowait()
+        except queue.Empty:
+            self.poll_id = self.after(100, self.poll_signals)
+            return
+        self.poll_id = None
+        if isinstance(result, Exception):
+            self.info_label.config(text="Error: " + str(result))
+            return
+        self.signals = result
+        missing = [label for label in self.labels if label not in self.signals]
+        self.info_label.config(text="Drag to zoom, double click to reset." +
+            ("\nOnly the first " + str(len(self.labels)) + " labels are shown, " + str(self.omitted) + " more are not plotted." if self.omitted else "") +
+            ("\nNot plotted (missing or text values): " + profile_manager.list_2_str(missing) if missing else ""))
+        self.reset_zoom("event")
+
+    def destroy(self):
+        if self.poll_id is not None:
+            self.after_cancel(self.poll_id)
+            self.poll_id = None
+        super().destroy()
+
+    def reset_zoom(self, event):
+        """Shows the whole time range of the measurement
+
+        Args:
+            event (_type_): unused
+        """
+        if not self.signals:
+            return
+        self.start = min(timestamps[0] for timestamps, _ in self.signals.values())
+        self.stop = max(timestamps[-1] for timestamps, _ in self.signals.values())
+        self.draw("event")
+
+    def start_zoom(self, event):
+        """Starts the selection of the zoom range
+
+        Args:
+            event (_type_): mouse event
+        """
+        self.zoom_x = event.x
+        self.canvas.delete("zoom")
+
+    def drag_zoom(self, event):
+        """Draws the selected zoom range
+
+        Args:
+            event (_type_): mouse event
+        """
+        self.canvas.delete("zoom")
+        self.canvas.create_rectangle(self.zoom_x, 0, event.x, self.canvas.winfo_height(), outline="gray", dash=(2, 2), tags="zoom")
+
+    def end_zoom(self, event):
+        """Re-reads the envelope for the selected time range
+
+        Args:
+            event (_type_): mouse event
+        """
+        self.canvas.delete("zoom")
+        if not self.signals or abs(event.x - self.zoom_x) < 5:
+            return
+        width = max(self.canvas.winfo_width() - 100, 1)
+        left, right = sorted((self.zoom_x, event.x))
+        span = self.stop - self.start
+        start = self.start + max(left - 90, 0) / width * span
+        stop = self.start + min(right - 90, width) / width * span
+        if stop > start:
+            self.start, self.stop = start, stop
+            self.draw("event")
+
+    def draw(self, event):
+        """Plots every label in its own lane
+
+        Args:
+            event (_type_): unused
+        """
+        self.canvas.delete("all")
+        if not self.signals or not hasattr(self, "start"):
+            return
+        width = max(self.canvas.winfo_width() - 100, 1)
+        lane_height = max(self.canvas.winfo_height() - 30, 1) / len(self.signals)
+        span = (self.stop - self.start) or 1.0
+
+        for i, (label, (timestamps, samples)) in enumerate(self.signals.items()):
+            times, values = mdf_export.min_max_envelope(timestamps, samples, self.start, self.stop, min(mdf_export.PREVIEW_POINTS, 2 * width))
+            top = i * lane_height
+            color = self.COLORS[i % len(self.COLORS)]
+            self.canvas.create_text(5, top + 5, text=label, anchor="nw", fill=color)
+            self.canvas.create_line(90, top + lane_height, 90 + width, top + lane_height, fill="lightgray")
+            finite = values == values
+            if not finite.any():
+                continue
+            v_min, v_max = float(values[finite].min()), float(values[finite].max())
+            self.canvas.create_text(85, top + 20, text="%.4g" % v_max, anchor="ne")
+            self.canvas.create_text(85, top + lane_height - 5, text="%.4g" % v_min, anchor="se")
+            scale = (lane_height - 20) / ((v_max - v_min) or 1.0)
+            points = []
+            for time, value in zip(times[finite], values[finite]):
+                points.append(min(max(90 + (time - self.start) / span * width, 90), 90 + width))
+                points.append(top + lane_height - 5 - (value - v_min) * scale)
+            if len(points) >= 4:
+                self.canvas.create_line(*points, fill=color)
+
+        self.canvas.create_text(90, self.canvas.winfo_height() - 5, text="%.3f s" % self.start, anchor="sw")
+        self.canvas.create_text(90 + width, self.canvas.winfo_height() - 5, text="%.3f s" % self.stop, anchor="se")
+
+
 def check_json_file():
     """Checks if a profiles.json file exists, otherwise creates a new file with a default profile
 
@@ -737,6 +1216,95 @@ def check_json_file():
             sys.exit()
 
 
+def convert_job(job: dict) -> dict:
+    """Convert stage of the export pipeline, converts the measurement to a DataFrame
+
+    Args:
+        job (dict): Job from MeasurementGUI.prepare_export_jobs
+
+    Returns:
+        dict: Job with the converted data
+    """
+    labels = job["labels"] if job["labels"] is not None else mdf_export.extract_signal_labels(job["meas"])
+    return dict(job, data=mdf_export.signals_to_dataframe(job["meas"], labels, job["raster"], job["method"]))
+
+
+def read_job(job: dict) -> dict:
+    """Read stage of the export pipeline, decodes the native samples of the measurement in parallel
+
+    Args:
+        job (dict): Job from MeasurementGUI.prepare_export_jobs
+
+    Returns:
+        dict: Job with the native samples
+    """
+    labels = job["labels"] if job["labels"] is not None else mdf_export.extract_signal_labels(job["meas"])
+    signals = mdf_export.read_native_signals(job["meas"], labels, job["decode_workers"], raw=job["raw"])
+    conversions = mdf_export.channel_conversions(job["meas"], list(signals)) if job["raw"] else None
+    return dict(job, signals=signals, conversions=conversions)
+
+
+def resample_job(job: dict) -> dict:
+    """Resample stage of the export pipeline, reduces the native samples to the raster.
+       For the raw export the conversion and lookup tables are collected as well
+
+    Args:
+        job (dict): Job with the native samples
+
+    Returns:
+        dict: Job with the converted data
+    """
+    if job["raw"]:
+        data, conversions, lookup = raw_conversion.raw_tables(job["signals"], job["conversions"], job["raster"])
+        return dict(job, signals=None, conversions=None, data=data, conversion_table=conversions, lookup_table=lookup)
+    return dict(job, signals=None, data=mdf_export.reduce_signals(job["signals"], job["raster"], job["method"]))
+
+
+def write_job(job: dict) -> dict:
+    """Write stage of the export pipeline, writes the converted data in all formats of the job
+
+    Args:
+        job (dict): Job with the converted data
+
+    Returns:
+        dict: Job with an error or None for every format
+    """
+    errors = []
+    for item in job["formats"]:
+        try:
+            if job["raw"] and item["format"] == "Excel":
+                raw_conversion.write_raw_excel(job["data"], job["conversion_table"], job["lookup_table"], item["out_file"])
+            elif job["raw"]:
+                raw_conversion.write_raw_matlab(job["data"], job["conversion_table"], job["lookup_table"], item["out_file"])
+            elif item["format"] == "Excel":
+                mdf_export.write_excel(job["data"], item["out_file"])
+            else:
+                mdf_export.write_matlab(job["data"], item["out_file"])
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+    return dict(job, data=None, errors=errors)
+
+
+def export_error_message(number: int, error: Exception) -> str:
+    """Generates the message for an error during the export of a measurement
+
+    Args:
+        number (int): Number of the measurement
+        error (Exception): Occured error
+
+    Returns:
+        str: Message for the state label
+    """
+    if isinstance(error, (AttributeError, ValueError)):
+        return 'Error Meas ' + str(number) + ': ' + 'There are no labels available for export.\n' + str(error)
+    if isinstance(error, OSError) and error.errno == 13:
+        return "Error Meas " + str(number) + ": " + "An Excel file with the same name is already opened. Please close the file."
+    if isinstance(error, IndexError):
+        return 'Error Meas ' + str(number) + ': ' + 'The path to the measurement does not exist.\n' + str(error)
+    return 'Error Meas ' + str(number) + ': ' + str(error)
+
+
 def limit_lines(file_path: str, max_lines: int):
     """Limitate the logfile to a maximum number of lines.
 
@@ -755,6 +1323,7 @@ def write_log_timestamp():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     log_file = open(LOG_FILE_PATH, 'a', encoding="utf-8")
     sys.stdout = log_file
     sys.stderr = log_file
@@ -763,6 +1332,8 @@ if __name__ == "__main__":
 
     app = MeasurementGUI()
     app.mainloop()
+    mdf_cache.close_all()
+    mdf_export.shutdown_executors()
 
     if log_file:
         log_file.close()
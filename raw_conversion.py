@@ -0,0 +1,387 @@
+"""raw_conversion.py
+
+   Exports the raw samples of the labels together with their conversion rules, so the
+   conversion to physical values can be done later and only where it is needed
+
+   @file raw_conversion.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import numpy as np
+from numexpr import evaluate
+from pandas import DataFrame, ExcelWriter, arrays
+from pandas.api.types import is_extension_array_dtype
+from scipy.io import savemat
+from asammdf.blocks import v4_blocks, v4_constants as v4c, v2_v3_constants as v23c
+
+import mdf_export
+from batch_manifest import atomic_output
+
+
+LOOKUP_LIMIT = 65536        # Maximum number of lookup entries per label, above the label is converted directly
+COEFFICIENTS = ["P1", "P2", "P3", "P4", "P5", "P6"]
+CONVERSION_COLUMNS = ["signal", "kind", "factor", "offset"] + COEFFICIENTS + ["formula"]
+LOOKUP_COLUMNS = ["signal", "raw", "value"]
+EXCEL_MAX_INTEGER = 2 ** 53  # Larger integers can not be stored exactly as Excel number, they are written as text
+
+# Kinds of the conversion types. Tables are exported as lookup of the occurring raw values,
+# conversion types which are not listed are applied directly to the exported data
+V4_KINDS = {
+    v4c.CONVERSION_TYPE_NON: "identity",
+    v4c.CONVERSION_TYPE_LIN: "linear",
+    v4c.CONVERSION_TYPE_RAT: "rational",
+    v4c.CONVERSION_TYPE_ALG: "algebraic",
+    v4c.CONVERSION_TYPE_TABI: "table",
+    v4c.CONVERSION_TYPE_TAB: "table",
+    v4c.CONVERSION_TYPE_RTAB: "table",
+    v4c.CONVERSION_TYPE_TABX: "table",
+    v4c.CONVERSION_TYPE_RTABX: "table",
+    v4c.CONVERSION_TYPE_BITFIELD: "table",
+}
+V3_KINDS = {
+    v23c.CONVERSION_TYPE_NONE: "identity",
+    v23c.CONVERSION_TYPE_LINEAR: "linear",
+    v23c.CONVERSION_TYPE_RAT: "rational",
+    v23c.CONVERSION_TYPE_FORMULA: "algebraic",
+    v23c.CONVERSION_TYPE_TABI: "table",
+    v23c.CONVERSION_TYPE_TAB: "table",
+    v23c.CONVERSION_TYPE_TABX: "table",
+    v23c.CONVERSION_TYPE_RTABX: "table",
+}
+
+
+def _description(kind: str, **values) -> dict:
+    """Creates a row of the conversions table, the unused columns are NaN
+
+    Args:
+        kind (str): Kind of the conversion
+        values: Values of the columns used by the kind
+
+    Returns:
+        dict: Row of the conversions table without the signal
+    """
+    description = {column: np.nan for column in CONVERSION_COLUMNS[1:]}
+    description.update(kind=kind, **values)
+    return description
+
+
+def conversion_kind(conversion) -> str:
+    """Determines the kind of a conversion from its conversion type
+
+    Args:
+        conversion (_type_): Conversion of the channel, None for channels without conversion
+
+    Returns:
+        str: "identity", "linear", "rational", "algebraic", "table" or "converted"
+    """
+    if conversion is None:
+        return "identity"
+    kinds = V4_KINDS if isinstance(conversion, v4_blocks.ChannelConversion) else V3_KINDS
+    return kinds.get(conversion.conversion_type, "converted")
+
+
+def describe_conversion(conversion, raw_values: np.ndarray, limit: int = LOOKUP_LIMIT) -> tuple:
+    """Describes the conversion of a label by its rule: factor and offset, the coefficients P1 to P6 of a
+       rational conversion or the formula of an algebraic conversion. Only tabular and value to text
+       conversions are exported as lookup table of the raw values which occur in the export, the
+       conversion is evaluated once per distinct raw value.
+
+    Args:
+        conversion (_type_): Conversion of the channel, None for channels without conversion
+        raw_values (np.ndarray): Distinct raw values of the label in the export
+        limit (int, optional): Maximum number of lookup entries, above the label is converted directly. Defaults to LOOKUP_LIMIT.
+
+    Returns:
+        tuple: Row of the conversions table and the lookup table as list of (raw, value)
+    """
+    kind = conversion_kind(conversion)
+    if kind == "identity":
+        return _description("identity"), []
+    if raw_values.dtype.kind not in "biuf":
+        return _description("converted"), []
+    if kind == "linear":
+        return _description("linear", factor=float(conversion.a), offset=float(conversion.b)), []
+    if kind == "rational":
+        return _description("rational", **{name: float(getattr(conversion, name)) for name in COEFFICIENTS}), []
+    if kind == "algebraic":
+        return _description("algebraic", formula=conversion.formula), []
+    if kind == "converted" or len(raw_values) > limit:
+        return _description("converted"), []
+
+    values = np.asarray(conversion.convert(raw_values))
+    kind = "text" if values.dtype.kind in "SUO" else "table"
+    return _description(kind), [(raw, mdf_export.decode_text(value)) for raw, value in zip(raw_values.tolist(), values.tolist())]
+
+
+def raw_column(raw: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """Creates the column of a label in the raw data from the selected raw samples. Integer and boolean
+       samples keep their data type in a nullable array, so no value passes through float.
+
+    Args:
+        raw (np.ndarray): Raw samples of the valid intervals
+        valid (np.ndarray): True for every raster interval with a sample
+
+    Returns:
+        np.ndarray: Column with missing values before the first sample
+    """
+    if raw.dtype.kind in "biu":
+        values = np.zeros(len(valid), dtype=raw.dtype)
+        values[valid] = raw
+        if raw.dtype.kind == "b":
+            return arrays.BooleanArray(values, ~valid)
+        return arrays.IntegerArray(values, ~valid)
+    if raw.dtype.kind == "f":
+        values = np.full(len(valid), np.nan, dtype=raw.dtype)
+        values[valid] = raw
+        return values
+    values = np.full(len(valid), np.nan, dtype=object)
+    values[valid] = [mdf_export.decode_text(value) for value in raw.tolist()]
+    return values
+
+
+def _lookup_raw(tables: list) -> np.ndarray:
+    """Joins the raw values of the lookup tables of all labels. If no common numeric data type keeps
+       all values exact, e.g. for uint64 and signed values, the raw values are kept as Python numbers.
+
+    Args:
+        tables (list): Distinct raw values of every label with lookup table
+
+    Returns:
+        np.ndarray: Raw column of the lookup table
+    """
+    if not tables:
+        return np.empty(0)
+    dtype = np.result_type(*tables)
+    if all(np.array_equal(table.astype(dtype).astype(table.dtype), table) for table in tables):
+        return np.concatenate(tables).astype(dtype)
+    return np.array([value for table in tables for value in table.tolist()], dtype=object)
+
+
+def raw_tables(signals: dict, conversions: dict, raster: float) -> tuple:
+    """Brings the raw samples to the raster and collects the conversion rules of the labels.
+       The last raw sample of every raster interval is selected by its index, so the values stay
+       valid raw codes in their native data type. The lookup table is limited to the rows of an
+       Excel sheet, labels which do not fit anymore are converted directly.
+
+    Args:
+        signals (dict): Raw timestamps and samples of every label from mdf_export.read_native_signals
+        conversions (dict): Conversion of every label from mdf_export.channel_conversions
+        raster (float): Raster of the exported time axis in seconds
+
+    Returns:
+        tuple: DataFrames with the raw data, the conversions and the lookup tables
+    """
+    signals, start, n_buckets = mdf_export.raster_axis(signals, raster)
+    data = {"time": start + np.arange(n_buckets) * raster}
+    rows = []
+    lookup_signals = []
+    lookup_raw = []
+    lookup_values = []
+    for label, (timestamps, samples) in signals.items():
+        index = mdf_export.last_sample_index(timestamps, start, raster, n_buckets)
+        valid = index >= 0
+        raw = samples[index[valid]]
+        present = np.unique(raw) if raw.dtype.kind in "biuf" else np.empty(0, dtype=object)
+
+        limit = min(LOOKUP_LIMIT, mdf_export.EXCEL_MAX_ROWS - 1 - len(lookup_signals))
+        description, table = describe_conversion(conversions.get(label), present, limit)
+        if description["kind"] == "converted":
+            data[label] = np.full(n_buckets, np.nan, dtype=object)
+            data[label][valid] = [mdf_export.decode_text(value) for value in np.asarray(conversions[label].convert(raw)).tolist()]
+        else:
+            data[label] = raw_column(raw, valid)
+        rows.append(dict(signal=label, **description))
+        if table:
+            lookup_signals.extend([label] * len(table))
+            lookup_raw.append(present)
+            lookup_values.extend(value for _, value in table)
+
+    lookup = DataFrame({"signal": lookup_signals, "raw": _lookup_raw(lookup_raw), "value": lookup_values}, columns=LOOKUP_COLUMNS)
+    return DataFrame(data), DataFrame(rows, columns=CONVERSION_COLUMNS), lookup
+
+
+def export_raw_measurement(meas: str, labels: list, raster: float, formats: list, out_file: str, workers: int = mdf_export.DEFAULT_DECODE_WORKERS) -> list:
+    """Exports the raw samples and conversion rules of a measurement in all selected formats
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels which should be exported. If None all labels of the measurement are exported
+        raster (float): Raster of the exported time axis in seconds
+        formats (list): Keys of mdf_export.EXPORT_FORMATS
+        out_file (str): Path to the output file without extension
+        workers (int, optional): Number of parallel workers for the decoding. Defaults to mdf_export.DEFAULT_DECODE_WORKERS.
+
+    Returns:
+        list: Paths to the written output files
+    """
+    if labels is None:
+        labels = mdf_export.extract_signal_labels(meas)
+    signals = mdf_export.read_native_signals(meas, labels, workers, raw=True)
+    data, conversions, lookup = raw_tables(signals, mdf_export.channel_conversions(meas, list(signals)), raster)
+    outputs = []
+    if "excel" in formats:
+        write_raw_excel(data, conversions, lookup, out_file + mdf_export.EXPORT_FORMATS["excel"])
+        outputs.append(out_file + mdf_export.EXPORT_FORMATS["excel"])
+    if "matlab" in formats:
+        write_raw_matlab(data, conversions, lookup, out_file + mdf_export.EXPORT_FORMATS["matlab"])
+        outputs.append(out_file + mdf_export.EXPORT_FORMATS["matlab"])
+    return outputs
+
+
+def apply_conversion(raw: np.ndarray, kind: str, factor: float = np.nan, offset: float = np.nan, lookup: DataFrame = None,
+                     coefficients: tuple = None, formula: str = None) -> np.ndarray:
+    """Converts raw values of a label to physical values with the exported conversion rule (vectorized)
+
+    Args:
+        raw (np.ndarray): Raw values
+        kind (str): Kind of the conversion from the conversions table
+        factor (float, optional): Factor of a linear conversion. Defaults to np.nan.
+        offset (float, optional): Offset of a linear conversion. Defaults to np.nan.
+        lookup (DataFrame, optional): Rows of the lookup table of the label. Defaults to None.
+        coefficients (tuple, optional): P1 to P6 of a rational conversion. Defaults to None.
+        formula (str, optional): Formula of an algebraic conversion in the variable X. Defaults to None.
+
+    Returns:
+        np.ndarray: Physical values, NaN for raw values without lookup entry
+    """
+    raw = np.asarray(raw)
+    if kind in ("identity", "converted"):
+        return raw
+    if kind == "linear":
+        return raw * factor + offset
+    if kind == "rational":
+        p1, p2, p3, p4, p5, p6 = coefficients
+        x = raw.astype(np.float64)
+        return (p1 * x ** 2 + p2 * x + p3) / (p4 * x ** 2 + p5 * x + p6)
+    if kind == "algebraic":
+        return evaluate(formula.replace("X1", "X"), local_dict={"X": raw.astype(np.float64), "INF": np.inf, "NaN": np.nan})
+
+    result = np.full(len(raw), np.nan, dtype=object if kind == "text" else np.float64)
+    if len(lookup) == 0:
+        return result
+    keys = np.array(lookup["raw"].tolist())
+    if keys.dtype.kind in "biuO" and raw.dtype.kind in "biu":
+        # The keys are raw values of the same label, so they fit into its data type and are compared exactly
+        keys = keys.astype(raw.dtype)
+    else:
+        keys = keys.astype(np.float64)
+        raw = raw.astype(np.float64)
+    order = np.argsort(keys)
+    keys = keys[order]
+    targets = lookup["value"].to_numpy()[order]
+    positions = np.clip(np.searchsorted(keys, raw), 0, len(keys) - 1)
+    found = keys[positions] == raw
+    result[found] = targets[positions[found]]
+    return result
+
+
+def apply_conversions(data: DataFrame, conversions: DataFrame, lookup: DataFrame) -> DataFrame:
+    """Converts all raw columns of an exported table to physical values
+
+    Args:
+        data (DataFrame): Raw data of the export
+        conversions (DataFrame): Conversions table of the export
+        lookup (DataFrame): Lookup table of the export
+
+    Returns:
+        DataFrame: Physical values
+    """
+    physical = data.copy()
+    for row in conversions.to_dict("records"):
+        if row["signal"] not in physical.columns or row["kind"] in ("identity", "converted"):
+            continue
+        column = physical[row["signal"]]
+        valid = column.notna().to_numpy()
+        raw = _native_values(column)[valid]
+        values = apply_conversion(raw, row["kind"], row["factor"], row["offset"], lookup[lookup["signal"] == row["signal"]],
+                                  tuple(row[name] for name in COEFFICIENTS), row["formula"])
+        converted = np.full(len(column), np.nan, dtype=np.float64 if values.dtype.kind in "biuf" else object)
+        converted[valid] = values
+        physical[row["signal"]] = converted
+    return physical
+
+
+def _native_values(column) -> np.ndarray:
+    """Returns the values of a column as numpy array, nullable columns in their numpy data type with 0 for missing values
+
+    Args:
+        column (Series): Column of the raw data
+
+    Returns:
+        np.ndarray: Values of the column
+    """
+    if is_extension_array_dtype(column.dtype):
+        return column.to_numpy(dtype=column.dtype.numpy_dtype, na_value=0)
+    return column.to_numpy()
+
+
+def _excel_numbers(table: DataFrame) -> DataFrame:
+    """Converts integers which can not be stored exactly as Excel number to text
+
+    Args:
+        table (DataFrame): Table of the export
+
+    Returns:
+        DataFrame: Table which can be written to Excel without rounding
+    """
+    table = table.copy()
+    for column in table.columns:
+        values = table[column]
+        if values.dtype.kind in "iu":
+            native = _native_values(values)
+            large = (native > EXCEL_MAX_INTEGER) if native.dtype.kind == "u" else (np.abs(native) > EXCEL_MAX_INTEGER)
+        elif values.dtype == object:
+            large = np.array([isinstance(value, (int, np.integer)) and abs(int(value)) > EXCEL_MAX_INTEGER for value in values.tolist()], dtype=bool)
+        else:
+            continue
+        if large.any():
+            text = values.astype(object)
+            text[large] = [str(value) for value in values[large].tolist()]
+            table[column] = text
+    return table
+
+
+def write_raw_excel(data: DataFrame, conversions: DataFrame, lookup: DataFrame, path: str):
+    """Writes the raw data, the conversions and the lookup tables atomically to the sheets of an Excel file.
+       Integers above EXCEL_MAX_INTEGER are written as text, so the raw codes stay exact.
+
+    Args:
+        data (DataFrame): Raw data
+        conversions (DataFrame): Conversions table
+        lookup (DataFrame): Lookup table
+        path (str): Path to the output file
+    """
+    with atomic_output(path) as temp_path:
+        with ExcelWriter(temp_path) as writer:
+            _excel_numbers(data).to_excel(writer, sheet_name="data", index=False)
+            conversions.to_excel(writer, sheet_name="conversions", index=False)
+            _excel_numbers(lookup).to_excel(writer, sheet_name="lookup", index=False)
+
+
+def write_raw_matlab(data: DataFrame, conversions: DataFrame, lookup: DataFrame, path: str):
+    """Writes the raw data atomically to a Matlab file, each column as a separate variable.
+       Integer and boolean columns keep their data type, missing values are written as 0 and
+       the struct valid contains a logical mask for every column with missing values.
+       The conversions and lookup tables are written as structs with one field per column.
+
+    Args:
+        data (DataFrame): Raw data
+        conversions (DataFrame): Conversions table
+        lookup (DataFrame): Lookup table
+        path (str): Path to the output file
+    """
+    data_dict = {}
+    valid = {}
+    for column in data.columns:
+        data_dict[column] = _native_values(data[column]).reshape(-1, 1)
+        if is_extension_array_dtype(data[column].dtype) and data[column].isna().any():
+            valid[column] = data[column].notna().to_numpy().reshape(-1, 1)
+    if valid:
+        data_dict["valid"] = valid
+    data_dict["conversions"] = {column: conversions[column].values.reshape(-1, 1) for column in conversions.columns}
+    data_dict["lookup"] = {column: lookup[column].values.reshape(-1, 1) for column in lookup.columns}
+    with atomic_output(path) as temp_path:
+        savemat(temp_path, data_dict, do_compression=False)
@@ -0,0 +1,231 @@
+"""signal_statistics.py
+
+   Calculates statistics of the labels in one pass over the samples of the measurement
+
+   @file signal_statistics.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import numpy as np
+from pandas import DataFrame, concat
+
+import mdf_cache
+import mdf_export
+
+
+PERCENTILES = (5, 50, 95)       # Percentiles of the statistics table
+RESERVOIR_SIZE = 100000         # Number of samples kept per label to estimate the percentiles
+
+
+class ChannelStatistics:
+    """Accumulates the statistics of a label chunk by chunk without keeping the samples in memory.
+       Mean and standard deviation are updated with the parallel algorithm of Chan et al.,
+       the percentiles are estimated from a uniform reservoir sample and are exact
+       as long as the label has less than RESERVOIR_SIZE samples.
+    """
+
+    def __init__(self, threshold: float = None, reservoir_size: int = RESERVOIR_SIZE):
+        """Initialize function of the class ChannelStatistics
+
+        Args:
+            threshold (float, optional): Threshold for the time above threshold. Defaults to None.
+            reservoir_size (int, optional): Number of samples kept for the percentiles. Defaults to RESERVOIR_SIZE.
+        """
+        self.threshold = threshold
+        self.unit = ""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.duration = 0.0
+        self.time_above = 0.0
+        self.last_time = None
+        self.last_value = None
+        self.reservoir_size = reservoir_size
+        self.reservoir = np.empty(0)
+        self.seen = 0
+        self.rng = np.random.default_rng(0)
+
+    def update(self, timestamps: np.ndarray, samples: np.ndarray):
+        """Adds a chunk of samples to the statistics
+
+        Args:
+            timestamps (np.ndarray): Timestamps of the samples
+            samples (np.ndarray): Numeric samples
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        samples = np.asarray(samples, dtype=np.float64)
+        if len(samples) == 0:
+            return
+
+        self.update_time_above(timestamps, samples)
+
+        values = samples[~np.isnan(samples)]
+        n = len(values)
+        if n == 0:
+            return
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self.update_reservoir(values)
+
+    def update_time_above(self, timestamps: np.ndarray, samples: np.ndarray):
+        """Adds the time in which the label is above the threshold. Each sample is held until the next timestamp
+
+        Args:
+            timestamps (np.ndarray): Timestamps of the samples
+            samples (np.ndarray): Numeric samples
+        """
+        if self.last_time is not None:
+            timestamps = np.concatenate(([self.last_time], timestamps))
+            samples = np.concatenate(([self.last_value], samples))
+        dt = np.diff(timestamps)
+        self.duration += dt.sum()
+        if self.threshold is not None:
+            self.time_above += dt[samples[:-1] > self.threshold].sum()
+        self.last_time = timestamps[-1]
+        self.last_value = samples[-1]
+
+    def update_reservoir(self, values: np.ndarray):
+        """Keeps a uniform random sample of all values (reservoir sampling)
+
+        Args:
+            values (np.ndarray): Values without NaN
+        """
+        free = self.reservoir_size - len(self.reservoir)
+        if free > 0:
+            self.reservoir = np.concatenate((self.reservoir, values[:free]))
+            self.seen += len(values[:free])
+            values = values[free:]
+        if len(values) == 0:
+            return
+        positions = self.rng.integers(0, self.seen + np.arange(1, len(values) + 1))
+        replace = positions < self.reservoir_size
+        self.reservoir[positions[replace]] = values[replace]
+        self.seen += len(values)
+
+    def merge(self, other: "ChannelStatistics"):
+        """Combines the statistics of another measurement into this one
+
+        Args:
+            other (ChannelStatistics): Statistics of the same label of another measurement
+        """
+        self.unit = self.unit or other.unit
+        if other.count > 0:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+            self.count = total
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+        self.duration += other.duration
+        self.time_above += other.time_above
+
+        seen = self.seen + other.seen
+        if seen > 0 and len(self.reservoir) + len(other.reservoir) > self.reservoir_size:
+            own = int(round(self.reservoir_size * self.seen / seen))
+            own = min(own, len(self.reservoir))
+            rest = min(self.reservoir_size - own, len(other.reservoir))
+            self.reservoir = np.concatenate((self.rng.choice(self.reservoir, own, replace=False),
+                                             self.rng.choice(other.reservoir, rest, replace=False)))
+        else:
+            self.reservoir = np.concatenate((self.reservoir, other.reservoir))
+        self.seen = seen
+
+    def result(self) -> dict:
+        """Returns the statistics of the label
+
+        Returns:
+            dict: Statistic values, NaN if the label has no numeric samples
+        """
+        empty = self.count == 0
+        result = {
+            "unit": self.unit,
+            "count": self.count,
+            "min": np.nan if empty else self.minimum,
+            "max": np.nan if empty else self.maximum,
+            "mean": np.nan if empty else self.mean,
+            "std": np.nan if empty else np.sqrt(self.m2 / self.count),
+        }
+        for percentile in PERCENTILES:
+            result["p" + str(percentile)] = np.nan if empty else np.percentile(self.reservoir, percentile)
+        result["duration"] = self.duration
+        result["time_above"] = self.time_above if self.threshold is not None else np.nan
+        return result
+
+
+def measurement_statistics(meas: str, labels: list, threshold: float = None) -> dict:
+    """Calculates the statistics of the labels in one pass over the native samples of the measurement.
+       Labels with text values are returned without statistics.
+
+    Args:
+        meas (str): Path to measurement
+        labels (list): Labels for the statistics
+        threshold (float, optional): Threshold for the time above threshold. Defaults to None.
+
+    Returns:
+        dict: ChannelStatistics of every label included in the measurement
+    """
+    statistics = {}
+    with mdf_cache.use_mdf(meas) as mdf:
+        for label in labels:
+            location = mdf_export.channel_location(mdf, label)
+            if location is None:
+                continue
+            stats = ChannelStatistics(threshold)
+            for signal in mdf.iter_get(group=location[0], index=location[1]):
+                stats.unit = stats.unit or signal.unit
+                if signal.samples.dtype.kind in "biuf" and signal.samples.ndim == 1:
+                    stats.update(signal.timestamps, signal.samples)
+            statistics[label] = stats
+    return statistics
+
+
+def statistics_table(statistics: dict) -> DataFrame:
+    """Converts the statistics of a measurement into a table with one row per label
+
+    Args:
+        statistics (dict): ChannelStatistics of every label
+
+    Returns:
+        DataFrame: Statistics table
+    """
+    rows = [dict(signal=label, **stats.result()) for label, stats in statistics.items()]
+    return DataFrame(rows)
+
+
+def batch_statistics_table(batch: dict) -> DataFrame:
+    """Combines the statistics of several measurements into one table. Contains the rows of every
+       measurement and the statistics of each label across all measurements.
+
+    Args:
+        batch (dict): Statistics of every measurement, keyed by the name of the measurement
+
+    Returns:
+        DataFrame: Statistics table of the batch
+    """
+    tables = []
+    combined = {}
+    for meas, statistics in batch.items():
+        table = statistics_table(statistics)
+        table.insert(0, "measurement", meas)
+        tables.append(table)
+        for label, stats in statistics.items():
+            if label not in combined:
+                combined[label] = ChannelStatistics(stats.threshold, stats.reservoir_size)
+            combined[label].merge(stats)
+    table = statistics_table(combined)
+    table.insert(0, "measurement", "All measurements")
+    tables.append(table)
+    return concat(tables, ignore_index=True)
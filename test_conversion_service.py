@@ -0,0 +1,162 @@
+"""test_conversion_service.py
+
+   Tests the HTTP interface of the conversion service with a local client.
+   The conversion itself is replaced by a stub, so no measurement files are needed.
+
+   Usage: python -m pytest test_conversion_service.py
+
+   @file test_conversion_service.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+
+import conversion_service
+
+
+TIMEOUT = 10    # Seconds to wait for a job state
+
+
+class ConversionServiceTest(unittest.TestCase):
+    """Starts the service on a free port with one worker and a queue for one waiting job
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.release = threading.Event()
+        patcher = mock.patch("mdf_export.export_measurement", side_effect=self.export_stub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = conversion_service.create_server(port=0, workers=1, queue_size=1)
+        self.url = "http://%s:%d" % self.server.server_address[:2]
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+
+    def tearDown(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.service.shutdown()
+        self.temp_dir.cleanup()
+
+    def export_stub(self, meas, labels, raster, formats, out_file, method):
+        """Replaces mdf_export.export_measurement, writes one small file per format after the release event
+        """
+        self.release.wait(TIMEOUT)
+        outputs = []
+        for export_format in formats:
+            path = out_file + conversion_service.mdf_export.EXPORT_FORMATS[export_format]
+            with open(path, 'w') as file:
+                file.write(os.path.basename(meas) + " " + ",".join(labels))
+            outputs.append(path)
+        return outputs
+
+    def request(self, method: str, path: str, body: dict = None) -> tuple:
+        """Sends a request to the service
+
+        Returns:
+            tuple: Status code, headers and body of the response
+        """
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+                return response.status, response.headers, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, e.read()
+
+    def submit(self, name: str) -> tuple:
+        """Submits a job for one measurement in the temporary directory
+
+        Returns:
+            tuple: Status code, headers and json body of the response
+        """
+        status, headers, body = self.request("POST", "/jobs", {
+            "measurements": [os.path.join(self.temp_dir.name, name)],
+            "labels": ["VehV_v"],
+            "formats": ["excel"],
+        })
+        return status, headers, json.loads(body)
+
+    def wait_for(self, job_id: str, states: tuple) -> dict:
+        """Polls the status of a job until it reaches one of the states
+        """
+        deadline = time.monotonic() + TIMEOUT
+        while time.monotonic() < deadline:
+            status, _, body = self.request("GET", "/jobs/" + job_id)
+            self.assertEqual(status, 200)
+            job = json.loads(body)
+            if job["status"] in states:
+                return job
+            time.sleep(0.02)
+        self.fail("Job " + job_id + " did not reach " + str(states))
+
+    def test_submit_poll_and_fetch(self):
+        self.release.set()
+        status, _, job = self.submit("drive.mf4")
+        self.assertEqual(status, 202)
+        self.assertEqual(job["status"], "queued")
+
+        job = self.wait_for(job["id"], ("finished", "failed"))
+        self.assertEqual(job["status"], "finished")
+        self.assertEqual(job["progress"], 1)
+        self.assertEqual(len(job["outputs"]), 1)
+        self.assertIn(job["id"], os.path.basename(job["outputs"][0]))
+
+        status, headers, body = self.request("GET", "/jobs/" + job["id"] + "/outputs/0")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "application/octet-stream")
+        self.assertEqual(body, b"drive.mf4 VehV_v")
+
+        status, _, _ = self.request("GET", "/jobs/" + job["id"] + "/outputs/1")
+        self.assertEqual(status, 404)
+
+    def test_invalid_request(self):
+        status, _, body = self.request("POST", "/jobs", {"labels": ["VehV_v"]})
+        self.assertEqual(status, 400)
+        self.assertIn("measurements", json.loads(body)["error"])
+
+        valid = {"measurements": ["drive.mf4"], "labels": ["VehV_v"]}
+        for field, value in (("raster", -1), ("raster", "fast"), ("formats", 5), ("formats", [5]), ("formats", "excel"),
+                             ("labels", "VehV_v"), ("labels", [1, 2]), ("method", ["mean"]), ("output_path", 5),
+                             ("measurements", {"drive.mf4": 1}), ("raw", "yes")):
+            status, _, body = self.request("POST", "/jobs", dict(valid, **{field: value}))
+            self.assertEqual(status, 400, field + " " + str(value))
+            self.assertIn("error", json.loads(body))
+
+        status, _, body = self.request("POST", "/jobs", {"measurements": ["drive.mf4"], "profile": ["x"]})
+        self.assertEqual(status, 400)
+        self.assertIn("profile", json.loads(body)["error"])
+
+    def test_queue_full(self):
+        status, _, running = self.submit("drive_1.mf4")
+        self.assertEqual(status, 202)
+        self.wait_for(running["id"], ("running",))
+
+        status, _, waiting = self.submit("drive_2.mf4")
+        self.assertEqual(status, 202)
+
+        status, headers, body = self.submit("drive_3.mf4")
+        self.assertEqual(status, 503)
+        self.assertEqual(headers["Retry-After"], str(conversion_service.RETRY_AFTER))
+        self.assertIn("error", body)
+
+        self.release.set()
+        for job_id in (running["id"], waiting["id"]):
+            self.assertEqual(self.wait_for(job_id, ("finished", "failed"))["status"], "finished")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""test_mdf_export.py
+
+   Tests the GUI independent export functions with small measurements written by asammdf
+
+   Usage: python -m pytest test_mdf_export.py
+
+   @file test_mdf_export.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from asammdf import MDF, Signal
+
+import mdf_cache
+import mdf_export
+
+
+def write_measurement(path: str, signals: list):
+    """Writes a measurement with one channel group per signal
+
+    Args:
+        path (str): Path to the measurement
+        signals (list): asammdf Signals
+    """
+    mdf = MDF(version="4.10")
+    for signal in signals:
+        mdf.append([signal])
+    mdf.save(path, overwrite=True)
+    mdf.close()
+
+
+class CollectWriter:
+    """Writer for merge_measurements which keeps the appended data in memory
+    """
+
+    def open(self, columns: list):
+        self.columns = columns
+        self.data = []
+
+    def append(self, data):
+        self.data.append(data)
+
+    def close(self):
+        pass
+
+    def discard(self):
+        pass
+
+
+class MeasurementTest(unittest.TestCase):
+    """Writes two measurements, the label Eng_runtime is only included in the first one
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        time = np.arange(0, 2, 0.1)
+        cls.first = os.path.join(cls.temp_dir.name, "drive.mf4")
+        write_measurement(cls.first, [Signal(np.sin(time), time, name="VehV_v"),
+                                      Signal(time * 2, time, name="Eng_runtime")])
+        cls.second = os.path.join(cls.temp_dir.name, "drive_2.mf4")
+        write_measurement(cls.second, [Signal(np.cos(time), time, name="VehV_v")])
+
+    @classmethod
+    def tearDownClass(cls):
+        mdf_cache.close_all()
+        mdf_export.shutdown_executors()
+        cls.temp_dir.cleanup()
+
+    def test_available_labels(self):
+        self.assertEqual(mdf_export.available_labels(self.first, ["Eng_runtime", "Unknown", "VehV_v"]), ["Eng_runtime", "VehV_v"])
+
+    def test_validate_labels_with_time_in_the_name(self):
+        missing, errors = mdf_export.validate_labels([self.first, self.second], ["Eng_runtime", "VehV_v"])
+        self.assertEqual(missing, {self.second: ["Eng_runtime"]})
+        self.assertEqual(errors, {})
+
+    def test_validate_labels_unreadable_measurement(self):
+        missing, errors = mdf_export.validate_labels([os.path.join(self.temp_dir.name, "missing.mf4")], ["VehV_v"])
+        self.assertEqual(missing, {})
+        self.assertEqual(len(errors), 1)
+
+    def test_extract_signal_labels(self):
+        self.assertEqual(mdf_export.extract_signal_labels(self.second), ["VehV_v"])
+
+    def test_read_native_signals_in_parallel(self):
+        labels = ["Eng_runtime", "Unknown", "VehV_v"]
+        single = mdf_export.read_native_signals(self.first, labels, workers=1)
+        parallel = mdf_export.read_native_signals(self.first, labels, workers=2)
+        self.assertEqual(list(parallel), ["Eng_runtime", "VehV_v"])
+        for label, (timestamps, samples) in single.items():
+            np.testing.assert_array_equal(parallel[label][0], timestamps)
+            np.testing.assert_array_equal(parallel[label][1], samples)
+
+    def test_merge_keeps_labels_with_time_in_the_name(self):
+        writer = CollectWriter()
+        missing = mdf_export.merge_measurements([self.first, self.second], ["Eng_runtime", "VehV_v"], 0.1, [writer], method="last")
+        self.assertEqual(writer.columns, ["time", "Eng_runtime", "VehV_v"])
+        self.assertEqual(missing, {self.first: [], self.second: ["Eng_runtime"]})
+        self.assertEqual(len(writer.data), 2)
+        self.assertTrue(writer.data[1]["Eng_runtime"].isna().all())
+        self.assertAlmostEqual(writer.data[1]["time"].iloc[0], writer.data[0]["time"].iloc[-1] + 0.1)
+
+
+class ReduceTest(unittest.TestCase):
+    """Reduction of native samples to the raster, a text channel starts later than the numeric one
+    """
+
+    def setUp(self):
+        self.speed = (np.arange(0, 1, 0.05), np.arange(20, dtype=np.float64))
+        self.state = (np.array([0.5, 0.55, 0.75]), np.array([b"OFF", b"ON", b"OFF"]))
+
+    def test_bucket_reduce_numeric(self):
+        timestamps, samples = self.speed
+        np.testing.assert_array_equal(mdf_export.bucket_reduce(timestamps, samples, 0.0, 0.1, 10, "max"), np.arange(1, 20, 2))
+        np.testing.assert_array_equal(mdf_export.bucket_reduce(timestamps, samples, 0.0, 0.1, 10, "mean"), np.arange(0.5, 19, 2))
+
+    def test_bucket_reduce_late_text(self):
+        timestamps, samples = self.state
+        result = mdf_export.bucket_reduce(timestamps, samples, 0.0, 0.1, 10, "max")
+        self.assertTrue(all(value != value for value in result[:5]))
+        self.assertEqual(list(result[5:]), ["ON", "ON", "OFF", "OFF", "OFF"])
+
+    def test_reduce_signals_late_text(self):
+        data = mdf_export.reduce_signals({"VehV_v": self.speed, "State": self.state}, 0.1, "max")
+        self.assertEqual(list(data.columns), ["time", "VehV_v", "State"])
+        self.assertEqual(len(data), 10)
+        self.assertTrue(data["State"].iloc[:5].isna().all())
+        self.assertEqual(data["State"].iloc[5], "ON")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mdf_export.write_matlab(data, os.path.join(temp_dir, "reduced.mat"))
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, "reduced.mat")))
+
+    def test_reduce_signals_skips_array_channels(self):
+        data = mdf_export.reduce_signals({"VehV_v": self.speed, "Matrix": (self.speed[0], np.zeros((20, 2)))}, 0.1, "mean")
+        self.assertEqual(list(data.columns), ["time", "VehV_v"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""test_raw_conversion.py
+
+   Tests the export of raw samples with their conversion rules with a small measurement written by asammdf
+
+   Usage: python -m pytest test_raw_conversion.py
+
+   @file test_raw_conversion.py
+   @author Lukas Gerstlauer
+   @email lukas.gerstlauer@de.bosch.com
+   @date 19.10.26
+   @version 1.0
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import openpyxl
+from asammdf import Signal
+from scipy.io import loadmat
+
+import mdf_cache
+import mdf_export
+import raw_conversion
+from test_mdf_export import write_measurement
+
+
+BIG = 2 ** 60 + 1   # Raw value which is not exact as float64
+
+
+class RawConversionTest(unittest.TestCase):
+    """Writes a measurement with integer labels which start later than the float label
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        time = np.arange(0, 2, 0.01)
+        late = np.arange(0.5, 2, 0.05)
+        cls.meas = os.path.join(cls.temp_dir.name, "raw.mf4")
+        write_measurement(cls.meas, [
+            Signal(np.sin(time), time, name="VehV_v"),
+            Signal((np.arange(len(late)) % 3).astype(np.uint8), late, name="State",
+                   conversion={"val_0": 0, "text_0": b"OFF", "val_1": 1, "text_1": b"ON", "val_2": 2, "text_2": b"ERR", "default": b""}),
+            Signal((np.arange(len(late)) * 3).astype(np.int16), late, name="Rat",
+                   conversion={"P1": 0, "P2": 2, "P3": 1, "P4": 0, "P5": 0, "P6": 1}),
+            Signal(BIG + np.arange(len(late), dtype=np.uint64), late, name="Big"),
+        ])
+        signals = mdf_export.read_native_signals(cls.meas, ["VehV_v", "State", "Rat", "Big"], raw=True)
+        cls.data, cls.conversions, cls.lookup = raw_conversion.raw_tables(signals, mdf_export.channel_conversions(cls.meas, list(signals)), 0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        mdf_cache.close_all()
+        cls.temp_dir.cleanup()
+
+    def test_integer_columns_stay_exact(self):
+        self.assertEqual(str(self.data["State"].dtype), "UInt8")
+        self.assertEqual(str(self.data["Rat"].dtype), "Int16")
+        self.assertEqual(str(self.data["Big"].dtype), "UInt64")
+        self.assertTrue(self.data["Big"].iloc[:5].isna().all())
+        # The last sample of the interval 0.5 <= t < 0.6 is the second one at 0.55
+        self.assertEqual(self.data["Big"].iloc[5], BIG + 1)
+        self.assertEqual(self.data["Big"].iloc[-1], BIG + 29)
+
+    def test_lookup_keys_are_exact(self):
+        self.assertEqual(list(self.conversions["kind"]), ["identity", "text", "rational", "identity"])
+        self.assertEqual(self.lookup["raw"].dtype, np.uint8)
+        self.assertEqual(dict(zip(self.lookup["raw"], self.lookup["value"])), {0: "OFF", 1: "ON", 2: "ERR"})
+
+        physical = raw_conversion.apply_conversions(self.data, self.conversions, self.lookup)
+        self.assertTrue(physical["State"].iloc[:5].isna().all())
+        self.assertEqual(physical["State"].iloc[5], "ON")
+        self.assertEqual(physical["Rat"].iloc[5], 2 * 3 + 1)
+
+    def test_apply_conversion_compares_integer_keys_exactly(self):
+        lookup = raw_conversion.DataFrame({"signal": ["Big", "Big"], "raw": np.array([BIG, BIG + 1], dtype=np.uint64), "value": ["a", "b"]})
+        result = raw_conversion.apply_conversion(np.array([BIG + 1, BIG, BIG + 2], dtype=np.uint64), "text", lookup=lookup)
+        self.assertEqual(result[:2].tolist(), ["b", "a"])
+        self.assertTrue(result[2] != result[2])
+
+    def test_write_matlab(self):
+        path = os.path.join(self.temp_dir.name, "raw.mat")
+        raw_conversion.write_raw_matlab(self.data, self.conversions, self.lookup, path)
+        content = loadmat(path)
+        self.assertEqual(content["Big"].dtype, np.uint64)
+        self.assertEqual(content["Big"][5, 0], BIG + 1)
+        self.assertEqual(content["Rat"].dtype, np.int16)
+        self.assertEqual(content["valid"]["Big"][0, 0][:, 0].tolist(), self.data["Big"].notna().tolist())
+
+    def test_write_excel(self):
+        path = os.path.join(self.temp_dir.name, "raw.xlsx")
+        raw_conversion.write_raw_excel(self.data, self.conversions, self.lookup, path)
+        rows = list(openpyxl.load_workbook(path)["data"].iter_rows(values_only=True))
+        self.assertEqual(rows[0], ("time", "VehV_v", "State", "Rat", "Big"))
+        self.assertEqual(rows[6][2:], (1, 3, str(BIG + 1)))
+        self.assertEqual(rows[1][2:], (None, None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()